@@ -0,0 +1,16 @@
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Query, status
+
+from app.services.database.repositories.fieldsets import FieldSet, InvalidFieldSet
+
+
+def fieldset_query(parse: Callable[[Optional[str], Optional[str]], FieldSet]) -> Callable[..., FieldSet]:
+    def dependency(fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+                   include: Optional[str] = Query(None, description="Comma separated relations to embed")) -> FieldSet:
+        try:
+            return parse(fields, include)
+        except InvalidFieldSet as error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+    return dependency
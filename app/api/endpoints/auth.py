@@ -1,26 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config.settings import settings
+from app.services.cart import CartError, cart_service
 from app.services.database.schemas.security.token import Token
-from app.services.database import DatabaseManager
+from app.services.database import get_db_session
 from app.services.database.models.user import User
-from app.utils.password_hashing import pwd_context
+from app.utils.password_hashing import PasswordHasherBusy, password_hasher
 from app.services.security import oauth2
 
 
-db = DatabaseManager()
-db.initialize(settings)
-
 router = APIRouter(
     tags=["Authentication"]
 )
 
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(db.get_db_session)):
+async def login(user_credentials: OAuth2PasswordRequestForm = Depends(), x_cart_id: Optional[str] = Header(None),
+                session: AsyncSession = Depends(get_db_session)):
     async with session:
         user = await session.scalar(select(User).filter(User.email == user_credentials.username))
 
@@ -28,7 +27,15 @@ async def login(user_credentials: OAuth2PasswordRequestForm = Depends(), session
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Invalid username or password")
 
-    if not pwd_context.verify(user_credentials.password, user.hashed_password):
+    try:
+        password_valid = await password_hasher.verify(user_credentials.password, user.hashed_password)
+
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many login attempts in progress, try again later",
+                            headers={"Retry-After": "1"})
+
+    if not password_valid:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Invalid username or password")
 
@@ -39,4 +46,12 @@ async def login(user_credentials: OAuth2PasswordRequestForm = Depends(), session
         }
     )
 
+    if x_cart_id is not None:
+        try:
+            await cart_service.merge(cart_service.anonymous_cart(x_cart_id), cart_service.user_cart(user.id))
+
+        except CartError:
+            # a stale or malformed anonymous cart id must not block signing in
+            pass
+
     return {"access_token": access_token, "token_type": "Bearer"}
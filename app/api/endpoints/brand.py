@@ -1,25 +1,29 @@
-from typing import Sequence
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.database.database import DatabaseManager
-from app.config.settings import settings
-from app.services.database.repositories.product import BrandRepository
-from app.services.database.schemas.product import BrandDTO, BrandResponse
+from app.api.dependencies import fieldset_query
+from app.services.cache import cache_response
+from app.services.database import get_db_session
+from app.services.database.query_tracking import query_budget
+from app.services.database.repositories.product import BrandRepository, ProductRepository
+from app.services.database.repositories.fieldsets import FieldSet
+from app.services.database.repositories.pagination import InvalidCursor
+from app.services.database.schemas.product import BrandDTO, BrandResponse, ProductSortKey
 from app.services.database.models import User
 from app.services.security.oauth2 import get_current_user
 from app.services.security.dependencies import admin_only
+from app.utils.conditional import Validators
+from app.utils.serialization import FastJSONResponse, serialize_many
 
 router = APIRouter(
     prefix="/brands",
     tags=["Brands"]
 )
-db = DatabaseManager()
-db.initialize(settings)
 
 
 @router.post("/create", response_model=BrandDTO, status_code=status.HTTP_201_CREATED, dependencies=[Depends(admin_only)])
-async def create_new_brand(brand: BrandDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def create_new_brand(brand: BrandDTO, session: AsyncSession = Depends(get_db_session)):
 
     brand_crud = BrandRepository(session)
 
@@ -32,7 +36,7 @@ async def create_new_brand(brand: BrandDTO, session: AsyncSession = Depends(db.g
 
 
 @router.put("/update", response_model=BrandDTO, status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def brand_update(brand: BrandDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def brand_update(brand: BrandDTO, session: AsyncSession = Depends(get_db_session)):
 
     brand_crud = BrandRepository(session)
 
@@ -48,7 +52,7 @@ async def brand_update(brand: BrandDTO, session: AsyncSession = Depends(db.get_d
 
 
 @router.delete("/delete", response_model=BrandDTO, status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def brand_delete(brand: BrandDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def brand_delete(brand: BrandDTO, session: AsyncSession = Depends(get_db_session)):
 
     brand_crud = BrandRepository(session)
 
@@ -64,23 +68,46 @@ async def brand_delete(brand: BrandDTO, session: AsyncSession = Depends(db.get_d
 
 
 @router.get("/{name}", response_model=BrandResponse, status_code=status.HTTP_200_OK)
-async def brand_get_by_id(name: str, offset: int = 0, limit: int = 20, session: AsyncSession = Depends(db.get_db_session)):
+@cache_response(tags=ProductRepository.listing_cache_tags)
+@query_budget(5)
+async def brand_get_by_id(name: str, request: Request,
+                          cursor: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                          sort: ProductSortKey = ProductSortKey.id, desc: bool = False,
+                          fieldset: FieldSet = Depends(fieldset_query(ProductRepository.fieldset)),
+                          session: AsyncSession = Depends(get_db_session)):
 
     name = name.title().replace("-", " ")
 
     brand_crud = BrandRepository(session)
 
-    brand_db = await brand_crud.get_brand_with_products(brand_name=name, offset=offset, limit=limit)
+    try:
+        brand_db = await brand_crud.get_brand_with_products(brand_name=name, limit=limit, cursor=cursor, sort=sort, descending=desc, fieldset=fieldset)
+
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
 
     if not brand_db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"Brand: {name} does not exist")
 
-    return brand_db
+    # the validators cover only the rows on this page, so building them costs a lookup by
+    # primary key instead of an aggregate over every product in the brand
+    product_ids = [product.id for product in brand_db["products"]]
+    last_modified = await ProductRepository(session).get_products_last_modified(product_ids)
+    validators = Validators.build(f"brand:{name}", last_modified, *(brand_db[field] for field in BrandDTO.__fields__),
+                                  product_ids, brand_db["next_cursor"], request.url.query, time_based=False)
+    if validators and validators.is_fresh(request):
+        return validators.not_modified()
+
+    response = FastJSONResponse({**brand_db, "products": serialize_many(fieldset.response_model(), brand_db["products"])})
+    if validators:
+        validators.apply(response)
+    return response
 
 
 @router.get("/", response_model=Sequence[BrandDTO], status_code=status.HTTP_200_OK)
-async def brand_get_all(session: AsyncSession = Depends(db.get_db_session)):
+@cache_response(tags=BrandRepository.cache_tags)
+async def brand_get_all(session: AsyncSession = Depends(get_db_session)):
 
     brand_crud = BrandRepository(session)
 
@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.cart import CartError, cart_service
+from app.services.database import get_db_session
+from app.services.database.models import User
+from app.services.database.schemas.cart import CartItemAdd, CartItemUpdate, CartResponse
+from app.services.security.oauth2 import get_current_user, get_optional_user
+
+router = APIRouter(
+    prefix="/cart",
+    tags=["Cart"]
+)
+
+
+@dataclass
+class CartRef:
+    cart_id: Optional[str]
+    # handed back to anonymous clients, who send it as X-Cart-Id on later requests
+    token: Optional[str] = None
+
+
+def _resolve_cart(x_cart_id: Optional[str], user: Optional[User], create: bool) -> CartRef:
+    if user is not None:
+        return CartRef(cart_id=cart_service.user_cart(user.id))
+    if x_cart_id is None:
+        if not create:
+            return CartRef(cart_id=None)
+        x_cart_id = cart_service.new_anonymous_token()
+    try:
+        return CartRef(cart_id=cart_service.anonymous_cart(x_cart_id), token=x_cart_id)
+
+    except CartError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+
+async def current_cart(x_cart_id: Optional[str] = Header(None), user: Optional[User] = Depends(get_optional_user)) -> CartRef:
+    return _resolve_cart(x_cart_id, user, create=False)
+
+
+async def writable_cart(response: Response, x_cart_id: Optional[str] = Header(None),
+                        user: Optional[User] = Depends(get_optional_user)) -> CartRef:
+    cart = _resolve_cart(x_cart_id, user, create=True)
+    if cart.token is not None:
+        response.headers["X-Cart-Id"] = cart.token
+    return cart
+
+
+@router.get("/", response_model=CartResponse, status_code=status.HTTP_200_OK)
+async def get_cart(cart: CartRef = Depends(current_cart), session: AsyncSession = Depends(get_db_session)):
+    return await cart_service.view(session, cart.cart_id, cart.token)
+
+
+@router.post("/add", response_model=CartResponse, status_code=status.HTTP_200_OK)
+async def add_to_cart(item: CartItemAdd, cart: CartRef = Depends(writable_cart),
+                      session: AsyncSession = Depends(get_db_session)):
+    try:
+        await cart_service.add_item(cart.cart_id, item.product_id, item.quantity)
+
+    except CartError as error:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
+
+    return await cart_service.view(session, cart.cart_id, cart.token)
+
+
+@router.put("/update", response_model=CartResponse, status_code=status.HTTP_200_OK)
+async def update_cart_item(item: CartItemUpdate, cart: CartRef = Depends(writable_cart),
+                           session: AsyncSession = Depends(get_db_session)):
+    try:
+        await cart_service.set_item(cart.cart_id, item.product_id, item.quantity)
+
+    except CartError as error:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
+
+    return await cart_service.view(session, cart.cart_id, cart.token)
+
+
+@router.delete("/remove/{product_id}", response_model=CartResponse, status_code=status.HTTP_200_OK)
+async def remove_cart_item(product_id: int, cart: CartRef = Depends(current_cart),
+                           session: AsyncSession = Depends(get_db_session)):
+    if cart.cart_id is not None:
+        await cart_service.remove_item(cart.cart_id, product_id)
+    return await cart_service.view(session, cart.cart_id, cart.token)
+
+
+@router.delete("/clear", status_code=status.HTTP_200_OK)
+async def clear_cart(cart: CartRef = Depends(current_cart)):
+    if cart.cart_id is not None:
+        await cart_service.clear(cart.cart_id)
+    return {"detail": "Cart has been successfully cleared"}
+
+
+@router.post("/merge", response_model=CartResponse, status_code=status.HTTP_200_OK)
+async def merge_cart(x_cart_id: str = Header(...), cur_user: User = Depends(get_current_user),
+                     session: AsyncSession = Depends(get_db_session)):
+    user_cart = cart_service.user_cart(cur_user.id)
+    try:
+        await cart_service.merge(cart_service.anonymous_cart(x_cart_id), user_cart)
+
+    except CartError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+    return await cart_service.view(session, user_cart)
@@ -1,24 +1,28 @@
-from typing import Sequence
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.database.database import DatabaseManager
-from app.config.settings import settings
-from app.services.database.repositories.product import CategoryRepository
-from app.services.database.schemas.product import CategoryDTO, CategoryResponse
+from app.api.dependencies import fieldset_query
+from app.services.cache import cache_response
+from app.services.database import get_db_session
+from app.services.database.query_tracking import query_budget
+from app.services.database.repositories.product import CategoryRepository, ProductRepository
+from app.services.database.repositories.fieldsets import FieldSet
+from app.services.database.repositories.pagination import InvalidCursor
+from app.services.database.schemas.product import CategoryDTO, CategoryResponse, ProductSortKey
 from app.services.security.dependencies import admin_only
+from app.utils.conditional import Validators
+from app.utils.serialization import FastJSONResponse, serialize_many
 
 
 router = APIRouter(
     prefix="/categories",
     tags=["Categories"]
 )
-db = DatabaseManager()
-db.initialize(settings)
 
 
 @router.post("/create", response_model=CategoryDTO, status_code=status.HTTP_201_CREATED, dependencies=[Depends(admin_only)])
-async def create_new_category(category: CategoryDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def create_new_category(category: CategoryDTO, session: AsyncSession = Depends(get_db_session)):
 
     category_crud = CategoryRepository(session)
 
@@ -31,7 +35,7 @@ async def create_new_category(category: CategoryDTO, session: AsyncSession = Dep
 
 
 @router.put("/update", response_model=CategoryDTO, status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def category_update(category: CategoryDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def category_update(category: CategoryDTO, session: AsyncSession = Depends(get_db_session)):
 
     category_crud = CategoryRepository(session)
 
@@ -47,7 +51,7 @@ async def category_update(category: CategoryDTO, session: AsyncSession = Depends
 
 
 @router.delete("/delete", response_model=CategoryDTO, status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def category_delete(category: CategoryDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def category_delete(category: CategoryDTO, session: AsyncSession = Depends(get_db_session)):
 
     category_crud = CategoryRepository(session)
 
@@ -63,23 +67,46 @@ async def category_delete(category: CategoryDTO, session: AsyncSession = Depends
 
 
 @router.get("/{name}", response_model=CategoryResponse, status_code=status.HTTP_200_OK)
-async def category_get_by_name(name: str, offset: int = 0, limit: int = 20, session: AsyncSession = Depends(db.get_db_session)):
+@cache_response(tags=ProductRepository.listing_cache_tags)
+@query_budget(5)
+async def category_get_by_name(name: str, request: Request,
+                               cursor: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                               sort: ProductSortKey = ProductSortKey.id, desc: bool = False,
+                               fieldset: FieldSet = Depends(fieldset_query(ProductRepository.fieldset)),
+                               session: AsyncSession = Depends(get_db_session)):
 
     name = name.title().replace("-", " ")
 
     category_crud = CategoryRepository(session)
 
-    category_db = await category_crud.get_category_with_products(category_name=name, offset=offset, limit=limit)
+    try:
+        category_db = await category_crud.get_category_with_products(category_name=name, limit=limit, cursor=cursor, sort=sort, descending=desc, fieldset=fieldset)
+
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
 
     if not category_db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"Category: '{name}' does not exist")
 
-    return category_db
+    # the validators cover only the rows on this page, so building them costs a lookup by
+    # primary key instead of an aggregate over every product in the category
+    product_ids = [product.id for product in category_db["products"]]
+    last_modified = await ProductRepository(session).get_products_last_modified(product_ids)
+    validators = Validators.build(f"category:{name}", last_modified, *(category_db[field] for field in CategoryDTO.__fields__),
+                                  product_ids, category_db["next_cursor"], request.url.query, time_based=False)
+    if validators and validators.is_fresh(request):
+        return validators.not_modified()
+
+    response = FastJSONResponse({**category_db, "products": serialize_many(fieldset.response_model(), category_db["products"])})
+    if validators:
+        validators.apply(response)
+    return response
 
 
-@router.get("/", response_model=Sequence[CategoryResponse], status_code=status.HTTP_200_OK)
-async def category_get_all(session: AsyncSession = Depends(db.get_db_session)):
+@router.get("/", response_model=Sequence[CategoryDTO], status_code=status.HTTP_200_OK)
+@cache_response(tags=CategoryRepository.cache_tags)
+async def category_get_all(session: AsyncSession = Depends(get_db_session)):
 
     category_crud = CategoryRepository(session)
 
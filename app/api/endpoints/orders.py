@@ -0,0 +1,94 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.services.cart import cart_service
+from app.services.database import get_db_session
+from app.services.database.models import Order, User
+from app.services.database.repositories.order import EmptyOrder, InsufficientStock, OrderRepository
+from app.services.database.repositories.pagination import InvalidCursor
+from app.services.database.schemas.order import OrderCreate, OrderPage, OrderResponse
+from app.services.export import ExportFormat, export_response
+from app.services.security.dependencies import admin_only
+from app.services.security.oauth2 import get_current_user
+from app.services.worker import job_queue
+
+router = APIRouter(
+    prefix="/orders",
+    tags=["Orders"]
+)
+
+SHIPPING_FIELDS = ("address", "city", "country", "telephone")
+
+
+@router.post("/checkout", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
+async def checkout(shipping: OrderCreate, cur_user: User = Depends(get_current_user),
+                   session: AsyncSession = Depends(get_db_session)):
+
+    cart_id = cart_service.user_cart(cur_user.id)
+    lines = await cart_service.items(cart_id)
+    if not lines:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Cart is empty")
+
+    shipping_data = {field: getattr(shipping, field) or getattr(cur_user, field) for field in SHIPPING_FIELDS}
+    missing = [field for field, value in shipping_data.items() if not value]
+    if missing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Missing shipping details: {', '.join(missing)}")
+
+    async def schedule_post_process(order_session: AsyncSession, order: Order) -> None:
+        # enqueued in the order's transaction: a failing queue fails the checkout before
+        # anything is committed, so a retry cannot place the order twice
+        await job_queue.enqueue("orders.post_process", {"order_id": order.id}, session=order_session)
+
+    order_crud = OrderRepository(session)
+    try:
+        order = await order_crud.place_order(cur_user.id, lines, shipping_data, before_commit=schedule_post_process)
+
+    except EmptyOrder as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+    except InsufficientStock as error:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(error))
+
+    for product_id in lines:
+        await cart_service.remove_item(cart_id, product_id)
+    return order
+
+
+@router.get("/", response_model=OrderPage, status_code=status.HTTP_200_OK)
+async def get_my_orders(cursor: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                        cur_user: User = Depends(get_current_user), session: AsyncSession = Depends(get_db_session)):
+
+    order_crud = OrderRepository(session)
+    try:
+        orders, next_cursor = await order_crud.get_orders_by_user(cur_user.id, limit=limit, cursor=cursor)
+
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+    return {"items": orders, "next_cursor": next_cursor}
+
+
+@router.get("/export", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def export_orders(format: ExportFormat = ExportFormat.ndjson, session: AsyncSession = Depends(get_db_session)):
+
+    order_crud = OrderRepository(session)
+    rows = order_crud.stream_orders(batch_size=settings.EXPORT_BATCH_SIZE)
+    return export_response(rows, OrderRepository.export_columns, format, filename="orders")
+
+
+@router.get("/{id}", response_model=OrderResponse, status_code=status.HTTP_200_OK)
+async def get_order(id: int, cur_user: User = Depends(get_current_user), session: AsyncSession = Depends(get_db_session)):
+
+    order_crud = OrderRepository(session)
+    order = await order_crud.get_order_by_id(id)
+
+    if not order or (order.user_id != cur_user.id and not cur_user.is_superuser):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Order with key id: {id} does not exists"
+        )
+    return order
@@ -1,26 +1,42 @@
-from typing import Sequence
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.database.database import DatabaseManager
+from app.api.dependencies import fieldset_query
 from app.config.settings import settings
+from app.services.cache import cache_response
+from app.services.database import get_db_session
+from app.services.database.query_tracking import query_budget
 from app.services.database.repositories.product import ProductRepository, ColorRepository, SizeRepository, RatingRepository
-from app.services.database.schemas.product import ProductCreate, ProductResponse, ProductUpdate, ColorDTO, SizeDTO, RatingDTO
+from app.services.database.repositories.fieldsets import FieldSet
+from app.services.database.repositories.pagination import InvalidCursor
+from app.services.database.schemas.product import ProductBatch, ProductCreate, ProductFacets, ProductFilter, ProductPage, ProductResponse, ProductSortKey, ProductUpdate, ColorDTO, SizeDTO, RatingDTO, RatingPage
 from app.services.database.models import User
+from app.services.export import ExportFormat, export_response
 from app.services.security.oauth2 import get_current_user
 from app.services.security.dependencies import admin_only
+from app.services.product_import import PARSERS, ImportFormat, ImportReport, ProductImporter
+from app.services.worker import job_queue, listing_warming_enabled
+from app.utils.conditional import Validators
+from app.utils.serialization import FastJSONResponse, fast_response, serialize_many
 
 router = APIRouter(
     prefix="/products",
     tags=["Products"]
 )
-db = DatabaseManager()
-db.initialize(settings)
+
+product_fieldset = fieldset_query(ProductRepository.fieldset)
+
+
+async def warm_listings() -> None:
+    # delayed and deduplicated so a burst of catalogue edits re-renders the listings once
+    if listing_warming_enabled():
+        await job_queue.enqueue("cache.warm_listings", delay=1, dedupe_key="cache.warm_listings")
 
 
 @router.post("/create", response_model=ProductResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(admin_only)])
-async def create_product(product: ProductCreate, session: AsyncSession = Depends(db.get_db_session)):
+async def create_product(product: ProductCreate, session: AsyncSession = Depends(get_db_session)):
 
     product_crud = ProductRepository(session)
     try:
@@ -31,11 +47,28 @@ async def create_product(product: ProductCreate, session: AsyncSession = Depends
             status_code=status.HTTP_409_CONFLICT,
             detail=str(error.orig).split("\n")[-1].replace("DETAIL:  ", "")
         )
+    await warm_listings()
     return result
 
 
+@router.post("/import", response_model=ImportReport, status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def import_products(request: Request, format: Optional[ImportFormat] = None,
+                          session: AsyncSession = Depends(get_db_session)):
+
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = ImportFormat.ndjson if "json" in content_type else ImportFormat.csv
+
+    importer = ProductImporter(session)
+    report = await importer.run(PARSERS[format](request.stream()))
+
+    if report.inserted or report.updated:
+        await warm_listings()
+    return report
+
+
 @router.put("/update", response_model=ProductResponse, status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def update_product(product: ProductUpdate, session: AsyncSession = Depends(db.get_db_session)):
+async def update_product(product: ProductUpdate, session: AsyncSession = Depends(get_db_session)):
 
     product_crud = ProductRepository(session)
     try:
@@ -46,46 +79,134 @@ async def update_product(product: ProductUpdate, session: AsyncSession = Depends
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(error.orig).split("\n")[-1].replace("DETAIL:  ", "")
         )
+    await warm_listings()
     return result
 
 
 @router.delete("/delete", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def delete_product(product: ProductUpdate, session: AsyncSession = Depends(db.get_db_session)):
+async def delete_product(product: ProductUpdate, session: AsyncSession = Depends(get_db_session)):
 
     product_crud = ProductRepository(session)
     deleted_product = await product_crud.delete_product(product.id)
     if not deleted_product:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Product has been not found")
+    await warm_listings()
     return {"detail": f"Product with id: {deleted_product.id} has been successfully deleted"}
 
 
+@router.get("/search", response_model=ProductPage, status_code=status.HTTP_200_OK)
+@cache_response(tags=ProductRepository.listing_cache_tags)
+@query_budget(3)
+async def search_products(q: str = Query(..., min_length=1, max_length=200), cursor: Optional[str] = None,
+                          limit: int = Query(20, ge=1, le=100), fieldset: FieldSet = Depends(product_fieldset),
+                          session: AsyncSession = Depends(get_db_session)):
+
+    product_crud = ProductRepository(session)
+    try:
+        products, next_cursor = await product_crud.search_products(query=q, limit=limit, cursor=cursor, fieldset=fieldset)
+
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+    return FastJSONResponse({"items": serialize_many(fieldset.response_model(), products), "next_cursor": next_cursor})
+
+
+@router.get("/export", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def export_products(format: ExportFormat = ExportFormat.ndjson, filters: ProductFilter = Depends(),
+                          session: AsyncSession = Depends(get_db_session)):
+
+    product_crud = ProductRepository(session)
+    rows = product_crud.stream_products(filters=product_crud.filter_clauses(filters),
+                                        batch_size=settings.EXPORT_BATCH_SIZE)
+    return export_response(rows, ProductRepository.export_columns, format, filename="products")
+
+
+def parse_ids(ids: list[str] = Query(..., description="Product ids, repeated or comma separated")) -> list[int]:
+    try:
+        parsed = [int(value) for item in ids for value in item.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail="ids must be integers")
+    # duplicates are dropped, the first occurrence keeps its position
+    parsed = list(dict.fromkeys(parsed))
+    if not parsed or len(parsed) > settings.PRODUCT_BATCH_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"Between 1 and {settings.PRODUCT_BATCH_MAX_IDS} ids are required")
+    return parsed
+
+
+@router.get("/batch", response_model=ProductBatch, status_code=status.HTTP_200_OK)
+@cache_response(tags=ProductRepository.listing_cache_tags)
+@query_budget(3)
+async def get_products_batch(ids: list[int] = Depends(parse_ids), fieldset: FieldSet = Depends(product_fieldset),
+                             session: AsyncSession = Depends(get_db_session)):
+
+    product_crud = ProductRepository(session)
+    products = {product.id: product for product in await product_crud.get_products_by_ids(
+        ids, options=product_crud.fieldset_options(fieldset))}
+
+    return FastJSONResponse({"items": serialize_many(fieldset.response_model(), (products[id] for id in ids if id in products)),
+                             "missing": [id for id in ids if id not in products]})
+
+
+@router.get("/facets", response_model=ProductFacets, status_code=status.HTTP_200_OK)
+@cache_response(tags=ProductRepository.listing_cache_tags)
+@query_budget(3)
+async def get_product_facets(filters: ProductFilter = Depends(), session: AsyncSession = Depends(get_db_session)):
+
+    product_crud = ProductRepository(session)
+    return await product_crud.get_product_facets(filters)
+
+
 @router.get("/{id}", response_model=ProductResponse, status_code=status.HTTP_200_OK)
-async def get_product(id: int, session: AsyncSession = Depends(db.get_db_session)):
+@cache_response(tags=ProductRepository.listing_cache_tags)
+@query_budget(4)
+async def get_product(id: int, request: Request, fieldset: FieldSet = Depends(product_fieldset),
+                      session: AsyncSession = Depends(get_db_session)):
 
     product_crud = ProductRepository(session)
-    result = await product_crud.get_product_by_id(id=id)
+
+    validators = Validators.build(f"product:{id}", await product_crud.get_product_last_modified(id=id), fieldset.key)
+    if validators and validators.is_fresh(request):
+        return validators.not_modified()
+
+    result = await product_crud.get_product_by_id(id=id, fieldset=fieldset)
 
     if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with key id: {id} does not exists"
         )
-    return result
+    response = fast_response(fieldset.response_model(), result)
+    if validators:
+        validators.apply(response)
+    return response
 
 
-@router.get("/", response_model=list[ProductResponse], status_code=status.HTTP_200_OK)
-async def get_all_products(offset: int = 0, limit: int = 20, session: AsyncSession = Depends(db.get_db_session)):
+@router.get("/", response_model=ProductPage, status_code=status.HTTP_200_OK)
+@cache_response(tags=ProductRepository.listing_cache_tags)
+@query_budget(3)
+async def get_all_products(cursor: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                           sort: ProductSortKey = ProductSortKey.id, desc: bool = False,
+                           filters: ProductFilter = Depends(), fieldset: FieldSet = Depends(product_fieldset),
+                           session: AsyncSession = Depends(get_db_session)):
 
     product_crud = ProductRepository(session)
-    result = await product_crud.get_all_products(offset=offset, limit=limit)
+    try:
+        products, next_cursor = await product_crud.get_all_products(
+            limit=limit, cursor=cursor, sort=sort, descending=desc, filters=product_crud.filter_clauses(filters),
+            fieldset=fieldset)
 
-    if not result:
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+    if not products and cursor is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Product with key id: {id} does not exists"
+            detail="No product found"
         )
-    return result
+    return FastJSONResponse({"items": serialize_many(fieldset.response_model(), products), "next_cursor": next_cursor})
 
 
 ##########################
@@ -94,7 +215,7 @@ async def get_all_products(offset: int = 0, limit: int = 20, session: AsyncSessi
 
 
 @router.post("/colors/create", response_model=ColorDTO, status_code=status.HTTP_201_CREATED, dependencies=[Depends(admin_only)])
-async def create_new_color(color: ColorDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def create_new_color(color: ColorDTO, session: AsyncSession = Depends(get_db_session)):
 
     color_crud = ColorRepository(session)
 
@@ -107,7 +228,7 @@ async def create_new_color(color: ColorDTO, session: AsyncSession = Depends(db.g
 
 
 @router.put("/colors/update", response_model=ColorDTO, status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def color_update(color: ColorDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def color_update(color: ColorDTO, session: AsyncSession = Depends(get_db_session)):
 
     color_crud = ColorRepository(session)
 
@@ -123,7 +244,7 @@ async def color_update(color: ColorDTO, session: AsyncSession = Depends(db.get_d
 
 
 @router.delete("/colors/delete", response_model=ColorDTO, status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def color_delete(color: ColorDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def color_delete(color: ColorDTO, session: AsyncSession = Depends(get_db_session)):
 
     color_crud = ColorRepository(session)
 
@@ -139,21 +260,29 @@ async def color_delete(color: ColorDTO, session: AsyncSession = Depends(db.get_d
 
 
 @router.get("/colors/{id}", response_model=ColorDTO, status_code=status.HTTP_200_OK)
-async def color_get_by_id(id: int, session: AsyncSession = Depends(db.get_db_session)):
+@cache_response(tags=ColorRepository.cache_tags)
+async def color_get_by_id(id: int, request: Request, response: Response, session: AsyncSession = Depends(get_db_session)):
 
     color_crud = ColorRepository(session)
 
+    validators = Validators.build(f"color:{id}", await color_crud.get_product_color_last_modified(id=id))
+    if validators and validators.is_fresh(request):
+        return validators.not_modified()
+
     color_db = await color_crud.get_product_color_by_id(id=id)
 
     if not color_db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"Color with id: {id} does not exist")
 
+    if validators:
+        validators.apply(response)
     return color_db
 
 
 @router.get("/colors/", response_model=Sequence[ColorDTO], status_code=status.HTTP_200_OK)
-async def color_get_all(session: AsyncSession = Depends(db.get_db_session)):
+@cache_response(tags=ColorRepository.cache_tags)
+async def color_get_all(session: AsyncSession = Depends(get_db_session)):
 
     color_crud = ColorRepository(session)
 
@@ -172,7 +301,7 @@ async def color_get_all(session: AsyncSession = Depends(db.get_db_session)):
 
 
 @router.post("/sizes/create", response_model=SizeDTO, status_code=status.HTTP_201_CREATED, dependencies=[Depends(admin_only)])
-async def create_new_size(size: SizeDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def create_new_size(size: SizeDTO, session: AsyncSession = Depends(get_db_session)):
 
     size_crud = SizeRepository(session)
 
@@ -185,7 +314,7 @@ async def create_new_size(size: SizeDTO, session: AsyncSession = Depends(db.get_
 
 
 @router.put("/sizes/update", response_model=SizeDTO, status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def size_update(size: SizeDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def size_update(size: SizeDTO, session: AsyncSession = Depends(get_db_session)):
 
     size_crud = SizeRepository(session)
 
@@ -201,7 +330,7 @@ async def size_update(size: SizeDTO, session: AsyncSession = Depends(db.get_db_s
 
 
 @router.delete("/sizes/delete", response_model=SizeDTO, status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def size_delete(size: SizeDTO, session: AsyncSession = Depends(db.get_db_session)):
+async def size_delete(size: SizeDTO, session: AsyncSession = Depends(get_db_session)):
 
     size_crud = SizeRepository(session)
 
@@ -217,21 +346,29 @@ async def size_delete(size: SizeDTO, session: AsyncSession = Depends(db.get_db_s
 
 
 @router.get("/sizes/{id}", response_model=SizeDTO, status_code=status.HTTP_200_OK)
-async def size_get_by_id(id: int, session: AsyncSession = Depends(db.get_db_session)):
+@cache_response(tags=SizeRepository.cache_tags)
+async def size_get_by_id(id: int, request: Request, response: Response, session: AsyncSession = Depends(get_db_session)):
 
     size_crud = SizeRepository(session)
 
+    validators = Validators.build(f"size:{id}", await size_crud.get_product_size_last_modified(id=id))
+    if validators and validators.is_fresh(request):
+        return validators.not_modified()
+
     size_db = await size_crud.get_product_size_by_id(id=id)
 
     if not size_db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"Size with id: {id} does not exist")
 
+    if validators:
+        validators.apply(response)
     return size_db
 
 
 @router.get("/sizes/", response_model=Sequence[SizeDTO], status_code=status.HTTP_200_OK)
-async def size_get_all(session: AsyncSession = Depends(db.get_db_session)):
+@cache_response(tags=SizeRepository.cache_tags)
+async def size_get_all(session: AsyncSession = Depends(get_db_session)):
 
     size_crud = SizeRepository(session)
 
@@ -250,7 +387,7 @@ async def size_get_all(session: AsyncSession = Depends(db.get_db_session)):
 
 
 @router.post("/ratings/create", response_model=RatingDTO, status_code=status.HTTP_201_CREATED)
-async def create_new_rating(rating: RatingDTO, session: AsyncSession = Depends(db.get_db_session), cur_user: User = Depends(get_current_user)):
+async def create_new_rating(rating: RatingDTO, session: AsyncSession = Depends(get_db_session), cur_user: User = Depends(get_current_user)):
     rating.user_id = cur_user.id
 
     rating_crud = RatingRepository(session)
@@ -260,7 +397,7 @@ async def create_new_rating(rating: RatingDTO, session: AsyncSession = Depends(d
 
 
 @router.put("/ratings/update", response_model=RatingDTO, status_code=status.HTTP_200_OK)
-async def rating_update(rating: RatingDTO, session: AsyncSession = Depends(db.get_db_session), cur_user: User = Depends(get_current_user)):
+async def rating_update(rating: RatingDTO, session: AsyncSession = Depends(get_db_session), cur_user: User = Depends(get_current_user)):
 
     rating_crud = RatingRepository(session)
 
@@ -280,7 +417,7 @@ async def rating_update(rating: RatingDTO, session: AsyncSession = Depends(db.ge
 
 
 @router.delete("/ratings/delete", response_model=RatingDTO, status_code=status.HTTP_200_OK)
-async def rating_delete(rating: RatingDTO, session: AsyncSession = Depends(db.get_db_session), cur_user: User = Depends(get_current_user)):
+async def rating_delete(rating: RatingDTO, session: AsyncSession = Depends(get_db_session), cur_user: User = Depends(get_current_user)):
 
     rating_crud = RatingRepository(session)
 
@@ -300,7 +437,7 @@ async def rating_delete(rating: RatingDTO, session: AsyncSession = Depends(db.ge
 
 
 @router.get("/ratings/{id}", response_model=RatingDTO, status_code=status.HTTP_200_OK)
-async def rating_get_by_id(id: int, session: AsyncSession = Depends(db.get_db_session)):
+async def rating_get_by_id(id: int, session: AsyncSession = Depends(get_db_session)):
 
     rating_crud = RatingRepository(session)
 
@@ -313,8 +450,29 @@ async def rating_get_by_id(id: int, session: AsyncSession = Depends(db.get_db_se
     return rating_db
 
 
+@router.get("/{id}/ratings", response_model=RatingPage, status_code=status.HTTP_200_OK)
+async def product_ratings_get(id: int, cursor: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                              session: AsyncSession = Depends(get_db_session)):
+
+    rating_crud = RatingRepository(session)
+    try:
+        ratings, next_cursor = await rating_crud.get_ratings_by_product(product_id=id, limit=limit, cursor=cursor)
+
+    except InvalidCursor as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+
+    return {"items": ratings, "next_cursor": next_cursor}
+
+
+@router.post("/{id}/ratings/refresh", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(admin_only)])
+async def product_ratings_refresh(id: int):
+
+    await job_queue.enqueue("ratings.refresh_summary", {"product_id": id}, dedupe_key=f"ratings.refresh_summary:{id}")
+    return {"detail": f"Rating summary refresh for product with id: {id} has been scheduled"}
+
+
 @router.get("/ratings/", response_model=Sequence[RatingDTO], status_code=status.HTTP_200_OK)
-async def rating_get_all(session: AsyncSession = Depends(db.get_db_session)):
+async def rating_get_all(session: AsyncSession = Depends(get_db_session)):
 
     rating_crud = RatingRepository(session)
 
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from app.services.profiling import SORT_KEYS, ProfileInfo, profile_store
+from app.services.security.dependencies import admin_only
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["Profiles"],
+    dependencies=[Depends(admin_only)]
+)
+
+
+# plain functions, so FastAPI runs the file reads in its threadpool
+
+@router.get("/", response_model=list[ProfileInfo], status_code=status.HTTP_200_OK)
+def list_profiles():
+    return profile_store.list()
+
+
+@router.get("/{id}", response_class=PlainTextResponse, status_code=status.HTTP_200_OK)
+def get_profile(id: str, sort: str = Query("cumulative", regex=f"^({'|'.join(SORT_KEYS)})$"),
+                limit: int = Query(50, ge=1, le=500)):
+
+    report = profile_store.render(id, sort=sort, limit=limit)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Profile with id: {id} does not exist")
+    info = profile_store.get(id)
+    header = f"{info.method} {info.path} -> {info.status} in {info.duration_ms} ms ({info.trigger})\n\n" if info else ""
+    return PlainTextResponse(header + report)
+
+
+@router.get("/{id}/raw", status_code=status.HTTP_200_OK)
+def download_profile(id: str):
+
+    path = profile_store.stats_path(id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Profile with id: {id} does not exist")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{id}.prof")
@@ -2,26 +2,31 @@ from typing import Sequence
 from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.database.database import DatabaseManager
+from app.api.dependencies import fieldset_query
 from app.config.settings import settings
+from app.services.database import get_db_session
 from app.services.database.repositories.user.user_repository import UserRepository
 from app.services.database.schemas.user import UserCreate, UserResponse, UserUpdate
 from app.services.database.models import User
+from app.services.database.repositories.fieldsets import FieldSet
 from app.services.database.schemas.user import GrantSuperUser
+from app.services.export import ExportFormat, export_response
 from app.services.security.oauth2 import get_current_user
 from app.services.security.dependencies import admin_only
+from app.utils.password_hashing import PasswordHasherBusy
+from app.utils.serialization import FastJSONResponse, fast_response, serialize_many
 
 
 router = APIRouter(
     prefix="/users",
     tags=["Users"]
 )
-db = DatabaseManager()
-db.initialize(settings)
+
+user_fieldset = fieldset_query(UserRepository.fieldset)
 
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_new_user(user_credentials: UserCreate, session: AsyncSession = Depends(db.get_db_session)):
+async def create_new_user(user_credentials: UserCreate, session: AsyncSession = Depends(get_db_session)):
 
     user_crud = UserRepository(session)
 
@@ -29,12 +34,18 @@ async def create_new_user(user_credentials: UserCreate, session: AsyncSession =
     if user_exists:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                             detail="This email address is already registered.")
-    new_user = await user_crud.create_user(user_credentials)
+    try:
+        new_user = await user_crud.create_user(user_credentials)
+
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many signups in progress, try again later",
+                            headers={"Retry-After": "1"})
     return new_user
 
 
 @router.put("/update", response_model=UserResponse, status_code=status.HTTP_200_OK)
-async def user_update(user_credentials: UserUpdate, session: AsyncSession = Depends(db.get_db_session), cur_user: User = Depends(get_current_user)):
+async def user_update(user_credentials: UserUpdate, session: AsyncSession = Depends(get_db_session), cur_user: User = Depends(get_current_user)):
 
     user_crud = UserRepository(session)
 
@@ -48,13 +59,19 @@ async def user_update(user_credentials: UserUpdate, session: AsyncSession = Depe
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Not enough permissions")
 
-    updated_user = await user_crud.update_user(user_credentials)
+    try:
+        updated_user = await user_crud.update_user(user_credentials)
+
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many password changes in progress, try again later",
+                            headers={"Retry-After": "1"})
 
     return updated_user
 
 
 @router.delete("/delete", response_model=UserResponse, status_code=status.HTTP_200_OK)
-async def user_delete(user_credentials: UserUpdate, session: AsyncSession = Depends(db.get_db_session), cur_user: User = Depends(get_current_user)):
+async def user_delete(user_credentials: UserUpdate, session: AsyncSession = Depends(get_db_session), cur_user: User = Depends(get_current_user)):
 
     user_crud = UserRepository(session)
 
@@ -73,36 +90,45 @@ async def user_delete(user_credentials: UserUpdate, session: AsyncSession = Depe
     return Response(status_code=status.HTTP_200_OK, content=f"User with id: {deleted_user.id} has been deleted")
 
 
+@router.get("/export", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
+async def users_export(format: ExportFormat = ExportFormat.ndjson, session: AsyncSession = Depends(get_db_session)):
+
+    user_crud = UserRepository(session)
+    rows = user_crud.stream_users(batch_size=settings.EXPORT_BATCH_SIZE)
+    return export_response(rows, UserRepository.export_columns, format, filename="users")
+
+
 @router.get("/{id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
-async def user_get_by_id(id: int, session: AsyncSession = Depends(db.get_db_session)):
+async def user_get_by_id(id: int, fieldset: FieldSet = Depends(user_fieldset),
+                         session: AsyncSession = Depends(get_db_session)):
 
     user_crud = UserRepository(session)
 
-    user = await user_crud.get_user_by_id(id=id)
+    user = await user_crud.get_user_by_id(id=id, fieldset=fieldset)
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"User with id: {id} does not exist")
 
-    return user
+    return fast_response(fieldset.response_model(), user)
 
 
 @router.get("/", response_model=Sequence[UserResponse], status_code=status.HTTP_200_OK)
-async def users_get_all(session: AsyncSession = Depends(db.get_db_session)):
+async def users_get_all(fieldset: FieldSet = Depends(user_fieldset), session: AsyncSession = Depends(get_db_session)):
 
     user_crud = UserRepository(session)
 
-    users = await user_crud.get_all_users()
+    users = await user_crud.get_all_users(fieldset=fieldset)
 
     if not users:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail=f"No users found")
 
-    return users
+    return FastJSONResponse(serialize_many(fieldset.response_model(), users))
 
 
 @router.patch("/superuser", status_code=status.HTTP_200_OK, dependencies=[Depends(admin_only)])
-async def grand_admin_privileges(user_credentials: GrantSuperUser, session: AsyncSession = Depends(db.get_db_session)):
+async def grand_admin_privileges(user_credentials: GrantSuperUser, session: AsyncSession = Depends(get_db_session)):
 
     user_crud = UserRepository(session)
 
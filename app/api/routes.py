@@ -5,6 +5,9 @@ from app.api.endpoints import products
 from app.api.endpoints import brand
 from app.api.endpoints import category
 from app.api.endpoints import auth
+from app.api.endpoints import cart
+from app.api.endpoints import orders
+from app.api.endpoints import profiles
 
 api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(users.router)
@@ -12,3 +15,6 @@ api_router.include_router(products.router)
 api_router.include_router(brand.router)
 api_router.include_router(category.router)
 api_router.include_router(auth.router)
+api_router.include_router(cart.router)
+api_router.include_router(orders.router)
+api_router.include_router(profiles.router)
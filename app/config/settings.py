@@ -31,6 +31,76 @@ class Settings(BaseSettings):
             path=f"/{values.get('POSTGRES_DB') or ''}",
         )
 
+    SQLALCHEMY_POOL_SIZE: int = 10
+    SQLALCHEMY_MAX_OVERFLOW: int = 20
+    SQLALCHEMY_POOL_RECYCLE: int = 1800
+    SQLALCHEMY_POOL_TIMEOUT: int = 30
+    SQLALCHEMY_ECHO: bool = False
+
+    QUERY_LOG_MODE: str = "off"
+    QUERY_LOG_SAMPLE_RATE: float = 0.01
+    QUERY_LOG_SLOW_THRESHOLD_MS: float = 200.0
+
+    METRICS_ENABLED: bool = True
+
+    @validator("QUERY_LOG_MODE")
+    def check_query_log_mode(cls, v: str) -> str:
+        if v not in ("off", "sampled", "slow"):
+            raise ValueError("QUERY_LOG_MODE must be one of: off, sampled, slow")
+        return v
+
+    # raise turns an exceeded budget into a 500, meant for development and test runs
+    QUERY_BUDGET_MODE: str = "warn"
+    QUERY_BUDGET_DEFAULT: Optional[int] = None
+    N_PLUS_ONE_THRESHOLD: int = 5
+    SERVER_TIMING_ENABLED: bool = True
+
+    PROFILING_ENABLED: bool = False
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_REPORTS: int = 50
+
+    @validator("QUERY_BUDGET_MODE")
+    def check_query_budget_mode(cls, v: str) -> str:
+        if v not in ("off", "warn", "raise"):
+            raise ValueError("QUERY_BUDGET_MODE must be one of: off, warn, raise")
+        return v
+
+    REDIS_URL: Optional[str] = None
+
+    USER_CACHE_BACKEND: str = "memory"
+    USER_CACHE_TTL: int = 300
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_TTL: int = 60
+    RESPONSE_CACHE_MAX_SIZE: int = 1000
+
+    REFERENCE_CACHE_ENABLED: bool = True
+    REFERENCE_CACHE_POLL_INTERVAL: float = 5.0
+
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
+    CART_BACKEND: str = "memory"
+    CART_TTL: int = 60 * 60 * 24 * 14
+    CART_MAX_CARTS: int = 100000
+    CART_MAX_ITEMS: int = 100
+    CART_MAX_QUANTITY: int = 99
+
+    JOB_QUEUE_BACKEND: str = "memory"
+    WORKER_CONCURRENCY: int = 4
+    WORKER_POLL_INTERVAL: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BACKOFF: float = 2.0
+    JOB_RETRY_BACKOFF_MAX: float = 300.0
+    JOB_LOCK_TIMEOUT: int = 300
+
+    EXPORT_BATCH_SIZE: int = 1000
+    PRODUCT_BATCH_MAX_IDS: int = 100
+
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
@@ -1,12 +1,57 @@
+import logging
+from contextlib import asynccontextmanager
+from functools import partial
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.api import routes
+from app.config.settings import settings
+from app.services.cache import ResponseCacheMiddleware, response_cache
+from app.services.database import db
+from app.services.database.query_tracking import QueryTrackingMiddleware
+from app.services.database.reference_cache import reference_cache
+from app.services.metrics import MetricsMiddleware, password_hasher_collector, pool_collector, registry
+from app.services.profiling import ProfilingMiddleware, profile_store
+from app.services.worker import create_worker, job_queue, listing_warming_enabled
+from app.utils.password_hashing import password_hasher
+from app.utils.serialization import FastJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db.initialize(settings)
+    await reference_cache.start(db)
+    # with the in-memory queue nothing else can see the jobs, so they run here
+    worker = create_worker(job_queue) if settings.JOB_QUEUE_BACKEND == "memory" else None
+    if worker is not None:
+        worker.start()
+    if listing_warming_enabled():
+        try:
+            await job_queue.enqueue("cache.warm_listings", dedupe_key="cache.warm_listings")
+        except Exception as error:
+            logging.getLogger(__name__).warning("Could not schedule cache warming: %s", error)
+    yield
+    if worker is not None:
+        await worker.shutdown()
+    await reference_cache.stop()
+    await db.dispose()
+    password_hasher.shutdown()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 origins = ["*"]
 
+if settings.RESPONSE_CACHE_ENABLED:
+    app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
+if settings.PROFILING_ENABLED:
+    # outside the response cache, so a cached entry never carries a profile id
+    app.add_middleware(ProfilingMiddleware, store=profile_store, header=settings.PROFILING_HEADER,
+                       sample_rate=settings.PROFILING_SAMPLE_RATE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -15,6 +60,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    # outside everything but query tracking, so it times cached responses too
+    app.add_middleware(MetricsMiddleware)
+    registry.register_collector(partial(pool_collector, db))
+    registry.register_collector(partial(password_hasher_collector, password_hasher))
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+# added last, so it is the outermost layer and MetricsMiddleware, inside it, can read
+# the query count it collects; a budget it refuses reaches metrics as a failed send
+app.add_middleware(QueryTrackingMiddleware, **QueryTrackingMiddleware.options(settings))
+
 app.include_router(routes.api_router)
 
 
@@ -0,0 +1,5 @@
+from .backends import CacheBackend, MemoryCache, RedisCache, create_cache
+from .response import CachePolicy, ResponseCache, ResponseCacheMiddleware, cache_response, response_cache
+
+__all__ = ("CacheBackend", "MemoryCache", "RedisCache", "create_cache",
+           "CachePolicy", "ResponseCache", "ResponseCacheMiddleware", "cache_response", "response_cache")
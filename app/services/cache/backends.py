@@ -0,0 +1,105 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # redis is an optional dependency
+    aioredis = None
+
+
+class CacheBackend(ABC):
+    def __init__(self, ttl: Optional[int] = None) -> None:
+        self.ttl = ttl
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self, ttl: Optional[int] = None, max_size: int = 10000) -> None:
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[Optional[float], Any]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisCache(CacheBackend):
+    def __init__(self, url: str, ttl: Optional[int] = None, prefix: str = "cache") -> None:
+        if aioredis is None:
+            raise RuntimeError("RedisCache requires the 'redis' package")
+        super().__init__(ttl)
+        self.prefix = prefix
+        self.client = aioredis.from_url(url)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self._key(key))
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        await self.client.set(self._key(key), json.dumps(value), ex=ttl or None)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self._key(key) for key in keys))
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{self.prefix}:*"):
+            await self.client.delete(key)
+
+
+def create_cache(backend: str, ttl: Optional[int] = None, max_size: int = 10000,
+                 redis_url: Optional[str] = None, prefix: str = "cache") -> CacheBackend:
+    if backend == "memory":
+        return MemoryCache(ttl=ttl, max_size=max_size)
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("REDIS_URL must be set to use the redis cache backend")
+        return RedisCache(redis_url, ttl=ttl, prefix=prefix)
+    raise ValueError(f"Unknown cache backend: {backend}")
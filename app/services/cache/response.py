@@ -0,0 +1,152 @@
+import hashlib
+import secrets
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import settings
+from app.utils.conditional import etag_matches
+from .backends import CacheBackend, create_cache
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: int
+    tags: tuple[str, ...]
+
+
+def cache_response(ttl: Optional[int] = None, tags: Iterable[str] = ()) -> Callable:
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__cache_policy__ = CachePolicy(
+            ttl=ttl if ttl is not None else settings.RESPONSE_CACHE_TTL, tags=tuple(tags))
+        return endpoint
+    return decorator
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    async def _tag_version(self, tag: str) -> str:
+        key = f"tag:{tag}"
+        version = await self.backend.get(key)
+        if version is None:
+            version = secrets.token_hex(4)
+            await self.backend.set(key, version, ttl=0)
+        return version
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        # entries are keyed by tag versions, so dropping the version orphans them
+        await self.backend.delete(*(f"tag:{tag}" for tag in tags))
+
+    async def build_key(self, scope: Scope, policy: CachePolicy) -> str:
+        headers = Headers(scope=scope)
+        authorization = headers.get("authorization")
+        auth_scope = hashlib.sha256(authorization.encode()).hexdigest()[:16] if authorization else "public"
+        query = "&".join(sorted(scope.get("query_string", b"").decode("latin-1").split("&")))
+        versions = [await self._tag_version(tag) for tag in policy.tags]
+        raw = "|".join((scope["path"], query, auth_scope, *versions))
+        return "response:" + hashlib.sha1(raw.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[dict[str, Any]]:
+        return await self.backend.get(key)
+
+    async def set(self, key: str, entry: dict[str, Any], ttl: int) -> None:
+        await self.backend.set(key, entry, ttl=ttl)
+
+
+class ResponseCacheMiddleware:
+    def __init__(self, app: ASGIApp, cache: "ResponseCache") -> None:
+        self.app = app
+        self.cache = cache
+
+    @staticmethod
+    def _match(scope: Scope) -> Optional[BaseRoute]:
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    async def _send_entry(self, send: Send, entry: dict[str, Any], scope: Scope, cache_status: str) -> None:
+        request_headers = Headers(scope=scope)
+        if etag_matches(request_headers.get("if-none-match"), entry["etag"]):
+            headers = [(name.encode("latin-1"), value.encode("latin-1"))
+                       for name, value in entry["headers"] if name in ("etag", "cache-control", "last-modified")]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers = MutableHeaders(raw=[(name.encode("latin-1"), value.encode("latin-1"))
+                                      for name, value in entry["headers"]])
+        headers["x-cache"] = cache_status
+        await send({"type": "http.response.start", "status": entry["status"], "headers": headers.raw})
+        await send({"type": "http.response.body", "body": entry["body"].encode("latin-1")})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._match(scope)
+        policy = getattr(getattr(route, "endpoint", None), "__cache_policy__", None)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+        # hits never reach the router, so the matched route is recorded here for the
+        # middlewares around this one that label by route template
+        scope["route"] = route
+
+        key = await self.cache.build_key(scope, policy)
+        entry = await self.cache.get(key)
+        if entry is not None:
+            await self._send_entry(send, entry, scope, "HIT")
+            return
+
+        start: dict[str, Any] = {}
+        chunks: list[bytes] = []
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+
+        body = b"".join(chunks)
+        headers = MutableHeaders(raw=list(start.get("headers", [])))
+        status_code = start.get("status", 500)
+
+        if status_code != 200 or "set-cookie" in headers:
+            await send({"type": "http.response.start", "status": status_code, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        visibility = "private" if Headers(scope=scope).get("authorization") else "public"
+        headers.setdefault("etag", make_etag(body))
+        headers["cache-control"] = f"{visibility}, max-age={policy.ttl}"
+        entry = {
+            "status": status_code,
+            "etag": headers["etag"],
+            "headers": [(name.decode("latin-1"), value.decode("latin-1")) for name, value in headers.raw],
+            "body": body.decode("latin-1"),
+        }
+        await self.cache.set(key, entry, ttl=policy.ttl)
+        await self._send_entry(send, entry, scope, "MISS")
+
+
+response_cache = ResponseCache(create_cache(
+    settings.RESPONSE_CACHE_BACKEND,
+    ttl=settings.RESPONSE_CACHE_TTL,
+    max_size=settings.RESPONSE_CACHE_MAX_SIZE,
+    redis_url=settings.REDIS_URL,
+    prefix="response",
+))
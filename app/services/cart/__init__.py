@@ -0,0 +1,5 @@
+from .store import CartStore, MemoryCartStore, RedisCartStore, create_cart_store
+from .service import CartError, CartService, cart_service
+
+__all__ = ("CartStore", "MemoryCartStore", "RedisCartStore", "create_cart_store",
+           "CartError", "CartService", "cart_service")
@@ -0,0 +1,124 @@
+import re
+import secrets
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.services.database.repositories.product import ProductRepository
+from app.services.database.schemas.cart import CartLine, CartResponse
+from .store import CartStore, create_cart_store
+
+
+ANONYMOUS_CART_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class CartError(ValueError):
+    pass
+
+
+class CartService:
+    def __init__(self, store: CartStore, max_items: int, max_quantity: int) -> None:
+        self.store = store
+        self.max_items = max_items
+        self.max_quantity = max_quantity
+
+    @staticmethod
+    def user_cart(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def anonymous_cart(token: str) -> str:
+        if not ANONYMOUS_CART_PATTERN.match(token):
+            raise CartError("Malformed cart id")
+        return f"anon:{token}"
+
+    @staticmethod
+    def new_anonymous_token() -> str:
+        return secrets.token_hex(16)
+
+    async def _check_capacity(self, cart_id: str, product_id: int, quantity: int) -> None:
+        if quantity == 0:
+            return
+        if await self.store.count(cart_id) >= self.max_items:
+            if not await self.store.contains(cart_id, product_id):
+                raise CartError(f"A cart can hold at most {self.max_items} different products")
+
+    async def add_item(self, cart_id: str, product_id: int, quantity: int) -> int:
+        if quantity <= 0:
+            raise CartError("Quantity to add must be at least 1")
+        await self._check_capacity(cart_id, product_id, quantity)
+        total = await self.store.increment(cart_id, product_id, quantity)
+        if total > self.max_quantity:
+            await self.store.set_quantity(cart_id, product_id, self.max_quantity)
+            total = self.max_quantity
+        return total
+
+    async def set_item(self, cart_id: str, product_id: int, quantity: int) -> None:
+        if quantity == 0:
+            await self.store.remove(cart_id, product_id)
+            return
+        await self._check_capacity(cart_id, product_id, quantity)
+        await self.store.set_quantity(cart_id, product_id, min(quantity, self.max_quantity))
+
+    async def remove_item(self, cart_id: str, product_id: int) -> None:
+        await self.store.remove(cart_id, product_id)
+
+    async def items(self, cart_id: str) -> dict[int, int]:
+        # lines left at 0 or below by older writes are not part of the cart
+        return {product_id: quantity for product_id, quantity in (await self.store.get(cart_id)).items() if quantity > 0}
+
+    async def clear(self, cart_id: str) -> None:
+        await self.store.delete(cart_id)
+
+    async def merge(self, source: str, target: str) -> None:
+        if source == target:
+            return
+        items = await self.items(source)
+        if not items:
+            return
+        existing = await self.items(target)
+        room = self.max_items - len(existing)
+        for product_id, quantity in items.items():
+            if product_id not in existing:
+                if room <= 0:
+                    continue
+                room -= 1
+            total = existing.get(product_id, 0) + quantity
+            await self.store.set_quantity(target, product_id, min(total, self.max_quantity))
+        await self.store.delete(source)
+
+    async def view(self, session: AsyncSession, cart_id: Optional[str], token: Optional[str] = None) -> CartResponse:
+        items = await self.items(cart_id) if cart_id else {}
+        # one query prices and stock-checks every line in the cart
+        products = await ProductRepository(session).get_products_by_ids(
+            list(items), options=ProductRepository.snapshot_options)
+        products = {product.id: product for product in products}
+
+        lines = []
+        total_price = Decimal(0)
+        for product_id, quantity in items.items():
+            product = products.get(product_id)
+            if product is None:
+                lines.append(CartLine(product_id=product_id, quantity=quantity, in_stock=False, available=False))
+                continue
+            unit_price = product.sale_price if product.sale_price is not None else product.base_price
+            line_total = unit_price * quantity
+            available = bool(product.in_stock) and product.quantity >= quantity
+            if available:
+                total_price += line_total
+            lines.append(CartLine(product_id=product_id, name=product.name, quantity=quantity,
+                                  unit_price=unit_price, in_stock=bool(product.in_stock), available=available,
+                                  line_total=line_total))
+
+        return CartResponse(cart_id=token, items=lines, total_quantity=sum(items.values()),
+                            total_price=total_price)
+
+
+cart_service = CartService(
+    create_cart_store(settings.CART_BACKEND, ttl=settings.CART_TTL, max_carts=settings.CART_MAX_CARTS,
+                      redis_url=settings.REDIS_URL, prefix="cart"),
+    max_items=settings.CART_MAX_ITEMS,
+    max_quantity=settings.CART_MAX_QUANTITY,
+)
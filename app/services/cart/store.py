@@ -0,0 +1,146 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # redis is an optional dependency
+    aioredis = None
+
+
+# carts are flat product_id -> quantity maps, so every operation touches a single key
+class CartStore(ABC):
+    def __init__(self, ttl: Optional[int] = None) -> None:
+        self.ttl = ttl
+
+    @abstractmethod
+    async def get(self, cart_id: str) -> dict[int, int]:
+        ...
+
+    @abstractmethod
+    async def count(self, cart_id: str) -> int:
+        ...
+
+    @abstractmethod
+    async def contains(self, cart_id: str, product_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def set_quantity(self, cart_id: str, product_id: int, quantity: int) -> None:
+        ...
+
+    @abstractmethod
+    async def increment(self, cart_id: str, product_id: int, amount: int) -> int:
+        ...
+
+    @abstractmethod
+    async def remove(self, cart_id: str, product_id: int) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, cart_id: str) -> None:
+        ...
+
+
+class MemoryCartStore(CartStore):
+    def __init__(self, ttl: Optional[int] = None, max_carts: int = 100000) -> None:
+        super().__init__(ttl)
+        self.max_carts = max_carts
+        self._carts: OrderedDict[str, tuple[Optional[float], dict[int, int]]] = OrderedDict()
+
+    def _cart(self, cart_id: str, create: bool = False) -> Optional[dict[int, int]]:
+        item = self._carts.get(cart_id)
+        if item is not None and item[0] is not None and item[0] <= time.monotonic():
+            del self._carts[cart_id]
+            item = None
+        if item is None:
+            if not create:
+                return None
+            item = (None, {})
+        # every access slides the expiry, like EXPIRE on each write in redis
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._carts[cart_id] = (expires_at, item[1])
+        self._carts.move_to_end(cart_id)
+        while len(self._carts) > self.max_carts:
+            self._carts.popitem(last=False)
+        return item[1]
+
+    async def get(self, cart_id: str) -> dict[int, int]:
+        return dict(self._cart(cart_id) or {})
+
+    async def count(self, cart_id: str) -> int:
+        return len(self._cart(cart_id) or {})
+
+    async def contains(self, cart_id: str, product_id: int) -> bool:
+        return product_id in (self._cart(cart_id) or {})
+
+    async def set_quantity(self, cart_id: str, product_id: int, quantity: int) -> None:
+        self._cart(cart_id, create=True)[product_id] = quantity
+
+    async def increment(self, cart_id: str, product_id: int, amount: int) -> int:
+        cart = self._cart(cart_id, create=True)
+        cart[product_id] = cart.get(product_id, 0) + amount
+        return cart[product_id]
+
+    async def remove(self, cart_id: str, product_id: int) -> None:
+        cart = self._cart(cart_id)
+        if cart is not None:
+            cart.pop(product_id, None)
+
+    async def delete(self, cart_id: str) -> None:
+        self._carts.pop(cart_id, None)
+
+
+class RedisCartStore(CartStore):
+    def __init__(self, url: str, ttl: Optional[int] = None, prefix: str = "cart") -> None:
+        if aioredis is None:
+            raise RuntimeError("RedisCartStore requires the 'redis' package")
+        super().__init__(ttl)
+        self.prefix = prefix
+        self.client = aioredis.from_url(url)
+
+    def _key(self, cart_id: str) -> str:
+        return f"{self.prefix}:{cart_id}"
+
+    async def get(self, cart_id: str) -> dict[int, int]:
+        raw = await self.client.hgetall(self._key(cart_id))
+        return {int(product_id): int(quantity) for product_id, quantity in raw.items()}
+
+    async def count(self, cart_id: str) -> int:
+        return await self.client.hlen(self._key(cart_id))
+
+    async def contains(self, cart_id: str, product_id: int) -> bool:
+        return bool(await self.client.hexists(self._key(cart_id), str(product_id)))
+
+    async def set_quantity(self, cart_id: str, product_id: int, quantity: int) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key(cart_id), str(product_id), quantity)
+            if self.ttl:
+                pipe.expire(self._key(cart_id), self.ttl)
+            await pipe.execute()
+
+    async def increment(self, cart_id: str, product_id: int, amount: int) -> int:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hincrby(self._key(cart_id), str(product_id), amount)
+            if self.ttl:
+                pipe.expire(self._key(cart_id), self.ttl)
+            result = await pipe.execute()
+        return int(result[0])
+
+    async def remove(self, cart_id: str, product_id: int) -> None:
+        await self.client.hdel(self._key(cart_id), str(product_id))
+
+    async def delete(self, cart_id: str) -> None:
+        await self.client.delete(self._key(cart_id))
+
+
+def create_cart_store(backend: str, ttl: Optional[int] = None, max_carts: int = 100000,
+                      redis_url: Optional[str] = None, prefix: str = "cart") -> CartStore:
+    if backend == "memory":
+        return MemoryCartStore(ttl=ttl, max_carts=max_carts)
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("REDIS_URL must be set to use the redis cart backend")
+        return RedisCartStore(redis_url, ttl=ttl, prefix=prefix)
+    raise ValueError(f"Unknown cart backend: {backend}")
@@ -1,3 +1,3 @@
-from app.services.database.database import DatabaseManager
+from app.services.database.database import DatabaseManager, db, get_db_session
 
-__all__ = ("DatabaseManager",)
+__all__ = ("DatabaseManager", "db", "get_db_session")
@@ -1,8 +1,10 @@
-from typing import Callable
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.config.settings import Settings
+from app.services.metrics import InstrumentedQueuePool, instrument_engine
 from .models import Base
+from .query_logging import QueryLogger
+from .query_tracking import track_engine
 
 
 class DatabaseManager:
@@ -14,11 +16,32 @@ class DatabaseManager:
     def initialize(self, settings: Settings) -> None:
         self.settings = settings
         self.engine = create_async_engine(
-            self.settings.SQLALCHEMY_DATABASE_URI, echo=True, pool_pre_ping=True)
-        self.session_factory = scoped_session(sessionmaker(
-            self.engine, class_=AsyncSession, expire_on_commit=False))
+            self.settings.SQLALCHEMY_DATABASE_URI,
+            echo=self.settings.SQLALCHEMY_ECHO,
+            pool_pre_ping=True,
+            pool_size=self.settings.SQLALCHEMY_POOL_SIZE,
+            max_overflow=self.settings.SQLALCHEMY_MAX_OVERFLOW,
+            pool_recycle=self.settings.SQLALCHEMY_POOL_RECYCLE,
+            pool_timeout=self.settings.SQLALCHEMY_POOL_TIMEOUT,
+            **({"poolclass": InstrumentedQueuePool} if self.settings.METRICS_ENABLED else {}),
+        )
+        self.query_logger = QueryLogger.from_settings(self.settings)
+        self.query_logger.attach(self.engine.sync_engine)
+        track_engine(self.engine.sync_engine)
+        if self.settings.METRICS_ENABLED:
+            instrument_engine(self.engine.sync_engine)
+        self.session_factory = async_sessionmaker(
+            self.engine, class_=AsyncSession, expire_on_commit=False)
 
-    async def get_db_session(self) -> Callable[..., AsyncSession]:
+    async def dispose(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
+        self.engine = None
+        self.session_factory = None
+
+    async def get_db_session(self) -> AsyncIterator[AsyncSession]:
+        if self.session_factory is None:
+            raise RuntimeError("DatabaseManager is not initialized")
         session: AsyncSession = self.session_factory()
         try:
             yield session
@@ -32,3 +55,10 @@ class DatabaseManager:
     async def init_models(self) -> None:
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+
+
+db = DatabaseManager()
+
+# the bound method itself, so FastAPI throws request errors straight into it and the
+# rollback runs; a wrapping generator would only close the inner one when collected
+get_db_session = db.get_db_session
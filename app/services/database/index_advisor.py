@@ -0,0 +1,114 @@
+import sys
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from sqlalchemy import ForeignKeyConstraint, MetaData, Table, UniqueConstraint
+
+
+@dataclass(frozen=True)
+class IndexInfo:
+    name: str
+    columns: tuple[str, ...]
+    unique: bool
+    partial: bool
+    btree: bool = True
+
+
+@dataclass(frozen=True)
+class Finding:
+    kind: str
+    table: str
+    detail: str
+
+    def __str__(self) -> str:
+        return f"[{self.kind}] {self.table}: {self.detail}"
+
+
+def _expression_name(expression) -> str:
+    return getattr(expression, "name", None) or str(expression)
+
+
+def table_indexes(table: Table) -> Iterator[IndexInfo]:
+    if table.primary_key.columns:
+        yield IndexInfo(name=table.primary_key.name or f"{table.name}_pkey",
+                        columns=tuple(column.name for column in table.primary_key.columns), unique=True, partial=False)
+
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            yield IndexInfo(name=constraint.name or f"{table.name}_unique",
+                            columns=tuple(column.name for column in constraint.columns), unique=True, partial=False)
+
+    for index in table.indexes:
+        options = index.dialect_options["postgresql"]
+        yield IndexInfo(
+            name=index.name,
+            columns=tuple(_expression_name(expression) for expression in index.expressions),
+            unique=bool(index.unique),
+            partial=options["where"] is not None,
+            btree=(options["using"] or "btree").lower() == "btree",
+        )
+
+
+def _covering_index(columns: tuple[str, ...], indexes: list[IndexInfo]) -> Optional[IndexInfo]:
+    # a btree can serve lookups on any leading subset of its columns, in any order
+    for index in indexes:
+        if index.btree and not index.partial and set(index.columns[:len(columns)]) == set(columns):
+            return index
+    return None
+
+
+def unindexed_foreign_keys(metadata: MetaData) -> list[Finding]:
+    findings = []
+    for table in metadata.sorted_tables:
+        indexes = list(table_indexes(table))
+        for constraint in table.constraints:
+            if not isinstance(constraint, ForeignKeyConstraint):
+                continue
+            columns = tuple(column.name for column in constraint.columns)
+            if _covering_index(columns, indexes) is None:
+                findings.append(Finding(
+                    "unindexed-fk", table.name,
+                    f"({', '.join(columns)}) references {constraint.referred_table.name} without a supporting index"))
+    return findings
+
+
+def redundant_indexes(metadata: MetaData) -> list[Finding]:
+    findings = []
+    for table in metadata.sorted_tables:
+        indexes = list(table_indexes(table))
+        for index in indexes:
+            # unique and partial indexes do work a wider index cannot, and only named indexes can be dropped
+            if index.unique or index.partial or not index.btree or index.name is None:
+                continue
+            for other in indexes:
+                if other is index or not other.btree or other.partial:
+                    continue
+                if other.columns[:len(index.columns)] != index.columns:
+                    continue
+                if other.columns == index.columns and not other.unique and other.name < index.name:
+                    # identical plain indexes: report only one of the pair
+                    continue
+                findings.append(Finding(
+                    "redundant-index", table.name,
+                    f"{index.name} ({', '.join(index.columns)}) is covered by {other.name} ({', '.join(other.columns)})"))
+                break
+    return findings
+
+
+def advise(metadata: MetaData) -> list[Finding]:
+    return unindexed_foreign_keys(metadata) + redundant_indexes(metadata)
+
+
+def main() -> int:
+    from app.services.database.models import Base
+
+    findings = advise(Base.metadata)
+    for finding in findings:
+        print(finding)
+    if not findings:
+        print("No index problems found")
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,10 @@
 from .base import Base, BaseModel
 from .user import User
-from .product import Product, Color, Size, Rating
+from .product import Product, Color, Size, Rating, RatingSummary
 from .brand import Brand
 from .category import Category
 from .order import Order, OrderItem
+from .job import Job
 
 __all__ = ("Base", "BaseModel", "User", "Product", "Color", "Size",
-           "Category", "Brand", "Rating", "Order", "OrderItem")
+           "Category", "Brand", "Rating", "RatingSummary", "Order", "OrderItem", "Job")
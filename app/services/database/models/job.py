@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from . import BaseModel
+
+
+class Job(BaseModel):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # workers claim the oldest runnable job; finished jobs are deleted, so this stays small
+        Index("ix_jobs_status_run_at", "status", "run_at", "id"),
+        # at most one queued job per dedupe key, so bursts of writes collapse into one run
+        Index("ix_jobs_dedupe_key_queued", "dedupe_key", unique=True,
+              postgresql_where=text("status = 'queued'")),
+    )
+
+    name = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False, server_default="{}")
+    status = Column(String, nullable=False, server_default="queued")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    max_attempts = Column(Integer, nullable=False, server_default="5")
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    dedupe_key = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
@@ -7,7 +7,7 @@ from . import BaseModel
 class Order(BaseModel):
     __tablename__ = "orders"
 
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     status = Column(String, nullable=False)
     total_price = Column(Float, nullable=False)
     address = Column(String, nullable=False)
@@ -23,10 +23,10 @@ class OrderItem(BaseModel):
     __tablename__ = "order_items"
 
     name = Column(String, index=True, nullable=False)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    product_id = Column(Integer, ForeignKey("products.id"))
-    color_id = Column(Integer, ForeignKey("colors.id"))
-    size_id = Column(Integer, ForeignKey("sizes.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), index=True)
+    color_id = Column(Integer, ForeignKey("colors.id"), index=True)
+    size_id = Column(Integer, ForeignKey("sizes.id"), index=True)
     price = Column(Float, nullable=False)
     quantity = Column(Integer, nullable=False)
 
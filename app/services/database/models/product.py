@@ -1,11 +1,29 @@
-from sqlalchemy import Boolean, CheckConstraint, Column, Float, Integer, String, ForeignKey, Numeric, Text
-from sqlalchemy.orm import relationship
+from typing import Optional
 
-from . import BaseModel
+from sqlalchemy import Boolean, CheckConstraint, Column, Computed, DateTime, Float, Index, Integer, String, ForeignKey, Numeric, Text, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
+
+from . import Base, BaseModel
+
+
+SEARCH_CONFIG = "english"
 
 
 class Product(BaseModel):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_products_name_trgm", "name", postgresql_using="gin",
+              postgresql_ops={"name": "gin_trgm_ops"}),
+        # listing filters: a category or brand page ordered by price keyset-paginates on (base_price, id)
+        Index("ix_products_category_id_base_price", "category_id", "base_price", "id"),
+        Index("ix_products_category_id_base_price_in_stock", "category_id", "base_price", "id",
+              postgresql_where=text("in_stock")),
+        Index("ix_products_brand_id_base_price", "brand_id", "base_price", "id"),
+        Index("ix_products_base_price_in_stock", "base_price", "id", postgresql_where=text("in_stock")),
+        Index("ix_products_sale_price", "sale_price", postgresql_where=text("sale_price IS NOT NULL")),
+    )
 
     name = Column(String, index=True)
     base_price = Column(Numeric(precision=8), server_default="1")
@@ -17,10 +35,14 @@ class Product(BaseModel):
     brand_id = Column(Integer, ForeignKey(
         'brands.id', ondelete="CASCADE"), nullable=True)
     color_id = Column(Integer, ForeignKey(
-        'colors.id', ondelete="CASCADE"), nullable=True)
+        'colors.id', ondelete="CASCADE"), nullable=True, index=True)
     size_id = Column(Integer, ForeignKey(
-        'sizes.id', ondelete="CASCADE"), nullable=True)
+        'sizes.id', ondelete="CASCADE"), nullable=True, index=True)
     quantity = Column(Integer, nullable=False, default=0)
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+        persisted=True)))
 
     category = relationship("Category", back_populates="products")
     brand = relationship("Brand", back_populates="products")
@@ -28,6 +50,8 @@ class Product(BaseModel):
     size = relationship("Size", back_populates="products")
     order_items = relationship("OrderItem", back_populates="product")
     ratings = relationship("Rating", back_populates="product")
+    rating_summary = relationship(
+        "RatingSummary", back_populates="product", uselist=False, passive_deletes=True)
 
 
 class Color(BaseModel):
@@ -48,9 +72,13 @@ class Size(BaseModel):
 
 class Rating(BaseModel):
     __tablename__ = "ratings"
+    __table_args__ = (
+        # per-product rating pages are keyset-paginated newest first on id
+        Index("ix_ratings_product_id_id", "product_id", "id"),
+    )
 
     user_id = Column(Integer, ForeignKey(
-        'users.id', ondelete='CASCADE'), nullable=False)
+        'users.id', ondelete='CASCADE'), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey(
         'products.id', ondelete='CASCADE'), nullable=False)
     stars = Column(Float, CheckConstraint(
@@ -59,3 +87,34 @@ class Rating(BaseModel):
 
     user = relationship('User', back_populates="ratings")
     product = relationship('Product', back_populates="ratings")
+
+
+class RatingSummary(Base):
+    __tablename__ = "product_rating_summaries"
+
+    product_id = Column(Integer, ForeignKey(
+        'products.id', ondelete='CASCADE'), primary_key=True)
+    rating_count = Column(Integer, nullable=False, server_default="0")
+    stars_total = Column(Float, nullable=False, server_default="0")
+    stars_1 = Column(Integer, nullable=False, server_default="0")
+    stars_2 = Column(Integer, nullable=False, server_default="0")
+    stars_3 = Column(Integer, nullable=False, server_default="0")
+    stars_4 = Column(Integer, nullable=False, server_default="0")
+    stars_5 = Column(Integer, nullable=False, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    product = relationship('Product', back_populates="rating_summary")
+
+    @staticmethod
+    def bucket(stars: float) -> int:
+        return min(5, max(1, int(stars + 0.5)))
+
+    @property
+    def average(self) -> Optional[float]:
+        if not self.rating_count:
+            return None
+        return round(self.stars_total / self.rating_count, 2)
+
+    @property
+    def histogram(self) -> dict[int, int]:
+        return {star: getattr(self, f"stars_{star}") for star in range(1, 6)}
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from functools import lru_cache
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.settings import Settings
+
+
+logger = logging.getLogger("app.database.query")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|%s|:\w+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*\((?:\s*\?\s*,?)+\)(?:\s*,\s*\((?:\s*\?\s*,?)+\))*", re.IGNORECASE)
+# asyncpg renders binds with a cast, $1::INTEGER; the multi-word types need spelling out
+_CAST = re.compile(r"::\s*(?:TIMESTAMP|TIME)(?:\s+WITH(?:OUT)?\s+TIME\s+ZONE)?(?:\(\d+\))?(?:\[\])*"
+                   r"|::\s*DOUBLE\s+PRECISION(?:\[\])*|::\s*\w+(?:\(\d+(?:\s*,\s*\d+)?\))?(?:\[\])*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _CAST.sub("", normalized)
+    normalized = _PARAMETER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    normalized = _VALUES_LIST.sub("VALUES (...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize_statement(statement).encode()).hexdigest()[:16]
+
+
+class QueryLogger:
+    MODES = ("off", "sampled", "slow")
+
+    def __init__(self, mode: str = "off", sample_rate: float = 0.01, slow_threshold_ms: float = 200.0) -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown query log mode: {mode}")
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "QueryLogger":
+        return cls(
+            mode=settings.QUERY_LOG_MODE,
+            sample_rate=settings.QUERY_LOG_SAMPLE_RATE,
+            slow_threshold_ms=settings.QUERY_LOG_SLOW_THRESHOLD_MS,
+        )
+
+    def attach(self, engine: Engine) -> None:
+        if self.mode == "off":
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def detach(self, engine: Engine) -> None:
+        if self.mode == "off":
+            return
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self.mode == "sampled" and random.random() >= self.sample_rate:
+            return
+        context._query_log_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started: Optional[float] = getattr(context, "_query_log_start", None)
+        if started is None:
+            return
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        if self.mode == "slow" and duration_ms < self.slow_threshold_ms:
+            return
+
+        self.emit(statement, duration_ms, cursor.rowcount, executemany)
+
+    def emit(self, statement: str, duration_ms: float, rowcount: int, executemany: bool = False) -> None:
+        record: dict[str, Any] = {
+            "fingerprint": fingerprint(statement),
+            "statement": normalize_statement(statement),
+            "duration_ms": round(duration_ms, 3),
+            "rowcount": rowcount,
+            "executemany": executemany,
+            "mode": self.mode,
+        }
+        level = logging.WARNING if duration_ms >= self.slow_threshold_ms else logging.INFO
+        logger.log(level, json.dumps(record), extra={"query": record})
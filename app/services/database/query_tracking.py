@@ -0,0 +1,159 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import Settings
+from .query_logging import fingerprint, normalize_statement
+
+
+logger = logging.getLogger("app.database.budget")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class RequestQueries:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+        self.statements: dict[str, str] = {}
+
+    def record(self, statement: str) -> None:
+        key = fingerprint(statement)
+        self.count += 1
+        self.shapes[key] += 1
+        self.statements.setdefault(key, statement)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(key, count) for key, count in self.shapes.most_common() if count >= threshold]
+
+    def describe(self, key: str) -> str:
+        return normalize_statement(self.statements[key])
+
+
+# statements issued while serving the current request; set by QueryTrackingMiddleware.
+# Tracking happens on the engine rather than on the session from get_db_session, so
+# sessions a handler opens on its own (job enqueueing, reference cache reloads) count too
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    queries = current_queries.get()
+    if queries is not None:
+        queries.record(statement)
+        context._tracking_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    queries = current_queries.get()
+    started: Optional[float] = getattr(context, "_tracking_started", None)
+    if queries is not None and started is not None:
+        queries.duration += time.perf_counter() - started
+
+
+def track_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def query_budget(max_queries: int) -> Callable:
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+class QueryTrackingMiddleware:
+    MODES = ("off", "warn", "raise")
+
+    def __init__(self, app: ASGIApp, budget_mode: str = "off", default_budget: Optional[int] = None,
+                 n_plus_one_threshold: int = 0, server_timing: bool = True) -> None:
+        if budget_mode not in self.MODES:
+            raise ValueError(f"Unknown query budget mode: {budget_mode}")
+        self.app = app
+        self.budget_mode = budget_mode
+        self.default_budget = default_budget
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.server_timing = server_timing
+
+    @classmethod
+    def options(cls, settings: Settings) -> dict[str, Any]:
+        return {
+            "budget_mode": settings.QUERY_BUDGET_MODE,
+            "default_budget": settings.QUERY_BUDGET_DEFAULT,
+            "n_plus_one_threshold": settings.N_PLUS_ONE_THRESHOLD,
+            "server_timing": settings.SERVER_TIMING_ENABLED,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # checked before the status goes out, so in raise mode the request still ends as a 500
+                self.check_budget(scope, queries)
+                if self.server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", (
+                        f'db;dur={queries.duration * 1000:.3f};desc="{queries.count} queries", '
+                        f"app;dur={(time.perf_counter() - started) * 1000:.3f}"))
+            await send(message)
+
+        token = current_queries.set(queries)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_queries.reset(token)
+            if self.n_plus_one_threshold:
+                self.report_repeated(scope, queries)
+
+    def check_budget(self, scope: Scope, queries: RequestQueries) -> None:
+        if self.budget_mode == "off":
+            return
+        route = scope.get("route")
+        budget = getattr(getattr(route, "endpoint", None), "__query_budget__", self.default_budget)
+        if route is None or budget is None or queries.count <= budget:
+            return
+
+        record: dict[str, Any] = {
+            "method": scope["method"],
+            "route": route.path,
+            "queries": queries.count,
+            "budget": budget,
+            "statements": [{"fingerprint": key, "count": count, "statement": queries.describe(key)}
+                           for key, count in queries.shapes.most_common(5)],
+        }
+        if self.budget_mode == "raise":
+            raise QueryBudgetExceeded(json.dumps(record))
+        logger.warning(json.dumps(record), extra={"query_budget": record})
+
+    def report_repeated(self, scope: Scope, queries: RequestQueries) -> None:
+        # the same statement shape over and over in one request is a loop issuing
+        # a query per item where a single batched query would do
+        repeated = queries.repeated(self.n_plus_one_threshold)
+        if not repeated:
+            return
+        route = scope.get("route")
+        for key, count in repeated:
+            record = {
+                "method": scope["method"],
+                "route": getattr(route, "path", None) or scope["path"],
+                "fingerprint": key,
+                "count": count,
+                "statement": queries.describe(key),
+            }
+            logger.warning(json.dumps(record), extra={"n_plus_one": record})
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from typing import Any, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from .database import DatabaseManager
+from .models import Brand, Category, Color, Size
+from .models import BaseModel as DBModel
+from .schemas.product import BrandDTO, CategoryDTO, ColorDTO, SizeDTO
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceTable:
+    def __init__(self, model: Type[DBModel], dto: Type[BaseModel]) -> None:
+        self.model = model
+        self.dto = dto
+        self.items: list[BaseModel] = []
+        self.by_id: dict[int, BaseModel] = {}
+        self.by_name: dict[str, BaseModel] = {}
+        self.version: Optional[tuple[Any, ...]] = None
+        self.stale = True
+        self.lock = asyncio.Lock()
+
+    def version_query(self) -> Any:
+        return select(
+            literal(self.model.__tablename__).label("table"),
+            func.count(self.model.id).label("rows"),
+            func.max(func.coalesce(self.model.updated_at, self.model.created_at)).label("last_modified")
+        )
+
+    async def reload(self, session: AsyncSession) -> None:
+        async with session:
+            version = (await session.execute(self.version_query())).one()
+            rows = (await session.scalars(select(self.model).order_by(self.model.id))).all()
+
+        items = [self.dto.from_orm(row) for row in rows]
+        self.items = items
+        self.by_id = {item.id: item for item in items}
+        self.by_name = {item.name: item for item in items}
+        self.version = (version.rows, version.last_modified)
+        self.stale = False
+
+
+class ReferenceCache:
+    def __init__(self, tables: dict[Type[DBModel], Type[BaseModel]], enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.tables = {model: ReferenceTable(model, dto) for model, dto in tables.items()}
+        self._poller: Optional[asyncio.Task] = None
+
+    def caches(self, model: Type[DBModel]) -> bool:
+        return self.enabled and model in self.tables
+
+    async def _table(self, session: AsyncSession, model: Type[DBModel]) -> ReferenceTable:
+        table = self.tables[model]
+        if table.stale:
+            async with table.lock:
+                if table.stale:
+                    await table.reload(session)
+        return table
+
+    def invalidate(self, model: Type[DBModel]) -> None:
+        if model in self.tables:
+            self.tables[model].stale = True
+
+    async def get_all(self, session: AsyncSession, model: Type[DBModel]) -> list[BaseModel]:
+        return list((await self._table(session, model)).items)
+
+    async def get_by_id(self, session: AsyncSession, model: Type[DBModel], id: int) -> Optional[BaseModel]:
+        return (await self._table(session, model)).by_id.get(id)
+
+    async def get_by_name(self, session: AsyncSession, model: Type[DBModel], name: str) -> Optional[BaseModel]:
+        return (await self._table(session, model)).by_name.get(name)
+
+    async def load(self, session: AsyncSession) -> None:
+        for table in self.tables.values():
+            await table.reload(session)
+
+    async def poll(self, session: AsyncSession) -> None:
+        tables = {table.model.__tablename__: table for table in self.tables.values()}
+        async with session:
+            result = await session.execute(union_all(*(table.version_query() for table in self.tables.values())))
+            versions = result.all()
+        for row in versions:
+            table = tables[row.table]
+            if table.version != (row.rows, row.last_modified):
+                table.stale = True
+
+    async def _run_poller(self, db: DatabaseManager, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.poll(db.session_factory())
+            except Exception:
+                logger.exception("Reference data version poll failed")
+
+    async def start(self, db: DatabaseManager) -> None:
+        if not self.enabled:
+            return
+        try:
+            await self.load(db.session_factory())
+        except Exception as error:
+            # tables stay stale and are loaded lazily by the first request that needs them
+            logger.warning("Could not preload reference data: %s", error)
+        self._poller = asyncio.create_task(self._run_poller(db, settings.REFERENCE_CACHE_POLL_INTERVAL))
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+        for table in self.tables.values():
+            table.stale = True
+
+
+reference_cache = ReferenceCache(
+    {Category: CategoryDTO, Brand: BrandDTO, Color: ColorDTO, Size: SizeDTO},
+    enabled=settings.REFERENCE_CACHE_ENABLED,
+)
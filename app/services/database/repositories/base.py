@@ -1,24 +1,38 @@
 from abc import ABC
-from typing import Any, Optional, Sequence, Type, Union
-from sqlalchemy import delete, insert, select, update
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Sequence, Type, Union
+from sqlalchemy import RowMapping, Select, and_, delete, func, insert, or_, select, tuple_, update
 
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 from sqlalchemy.orm.interfaces import MapperOption
 
+from app.services.cache import response_cache
 from app.services.database.models import BaseModel as DBModel
+from app.services.database.reference_cache import reference_cache
+from .loader import BatchFunction, BatchLoader, session_loader
+from .pagination import decode_cursor, encode_cursor
 
 
 class BaseRepository(ABC):
     model: Type[DBModel]
+    cache_tags: tuple[str, ...] = ()
 
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
+    async def _invalidate_cache(self) -> None:
+        reference_cache.invalidate(self.model)
+        if self.cache_tags:
+            await response_cache.invalidate_tags(*self.cache_tags)
+
     async def _insert(self, **kwargs: Any) -> DBModel:
         async with self.session as session:
             stmt = insert(self.model).values(**kwargs).returning(self.model)
             result = await session.scalar(stmt)
             await session.commit()
+        await self._invalidate_cache()
         return result
 
     async def _update(self, *args: Any, **kwargs: Any) -> DBModel:
@@ -27,25 +41,74 @@ class BaseRepository(ABC):
                 *args).values(**kwargs).returning(self.model)
             result = await session.scalar(stmt)
             await session.commit()
+        await self._invalidate_cache()
+        return result
+
+    async def _select_one(self, *args: Any, options: Sequence[MapperOption] = ()) -> DBModel:
+        async with self.session as session:
+            stmt = select(self.model).where(*args).options(*options)
+            result = await session.scalar(stmt)
         return result
 
-    async def _select_one(self, *args: Any) -> DBModel:
+    @staticmethod
+    def _last_modified(model: Type[DBModel]) -> Any:
+        return func.coalesce(model.updated_at, model.created_at)
+
+    async def _select_last_modified(self, *args: Any) -> Optional[datetime]:
         async with self.session as session:
-            stmt = select(self.model).where(*args)
+            stmt = select(self._last_modified(self.model)).where(*args)
             result = await session.scalar(stmt)
         return result
 
-    async def _select_all(self) -> Sequence[DBModel]:
+    async def _select_all(self, options: Sequence[MapperOption] = ()) -> Sequence[DBModel]:
         async with self.session as session:
-            stmt = select(self.model)
+            stmt = select(self.model).options(*options)
             result = await session.scalars(stmt)
         return result.all()
 
+    async def _stream(self, stmt: Select, batch_size: int = 1000) -> AsyncIterator[Sequence[RowMapping]]:
+        # a server-side cursor fetches batch_size rows per round trip, so memory stays
+        # flat however large the table is; the session stays open until the last batch
+        async with self.session as session:
+            result = await session.stream(stmt.execution_options(yield_per=batch_size))
+            async for partition in result.mappings().partitions():
+                yield partition
+
+    def _loader(self, name: str, batch_fn: BatchFunction) -> BatchLoader:
+        return session_loader(self.session, name, batch_fn)
+
+    async def _select_many_by_id(self, ids: list[int]) -> dict[int, DBModel]:
+        async with self.session as session:
+            result = await session.scalars(select(self.model).where(self.model.id.in_(ids)))
+        return {row.id: row for row in result.all()}
+
+    def _as_dto(self, row: Optional[DBModel]) -> Optional[BaseModel]:
+        # reference rows come back as their DTOs whether or not the cache is enabled,
+        # so callers see one type and never reach for a relationship that is not there
+        return None if row is None else reference_cache.tables[self.model].dto.from_orm(row)
+
+    async def _select_by_id(self, id: int) -> Optional[BaseModel]:
+        if reference_cache.caches(self.model):
+            return await reference_cache.get_by_id(self.session, self.model, id)
+        # concurrent lookups within a request become one IN (...) query
+        return self._as_dto(await self._loader(self.model.__tablename__, self._select_many_by_id).load(id))
+
+    async def _select_by_name(self, name: str) -> Optional[BaseModel]:
+        if reference_cache.caches(self.model):
+            return await reference_cache.get_by_name(self.session, self.model, name)
+        return self._as_dto(await self._select_one(self.model.name == name))
+
+    async def _select_all_cached(self) -> list[BaseModel]:
+        if reference_cache.caches(self.model):
+            return await reference_cache.get_all(self.session, self.model)
+        return [self._as_dto(row) for row in await self._select_all()]
+
     async def _delete(self, *args: Any) -> DBModel:
         async with self.session as session:
             stmt = delete(self.model).where(*args).returning(self.model)
             result = await session.scalar(stmt)
             await session.commit()
+        await self._invalidate_cache()
         return result
 
     async def _pagination(self, offset: int, limit: int) -> list[DBModel]:
@@ -53,3 +116,42 @@ class BaseRepository(ABC):
             stmt = select(self.model).offset(offset).limit(limit)
             result = await session.scalars(stmt)
         return result.all()
+
+    @staticmethod
+    def _keyset_boundary(keys: Sequence[InstrumentedAttribute], values: Sequence[Any], descending: bool) -> Any:
+        if len(keys) == 1:
+            return keys[0] < values[0] if descending else keys[0] > values[0]
+
+        column, id = keys
+        value, last_id = values
+        after = tuple_(column, id) < tuple_(value, last_id) if descending else tuple_(column, id) > tuple_(value, last_id)
+        if not column.expression.nullable:
+            return after
+
+        # Postgres sorts NULLs last ascending and first descending, and a row comparison
+        # involving NULL is NULL, so the block of NULL sort values is stepped through by id
+        if value is None:
+            within_nulls = and_(column.is_(None), id < last_id if descending else id > last_id)
+            return or_(within_nulls, column.is_not(None)) if descending else within_nulls
+        return after if descending else or_(after, column.is_(None))
+
+    async def _keyset_pagination(self, limit: int, cursor: Optional[str] = None,
+                                 order_by: Optional[InstrumentedAttribute] = None, descending: bool = False,
+                                 filters: Sequence[Any] = (), options: Sequence[MapperOption] = ()
+                                 ) -> tuple[list[DBModel], Optional[str]]:
+        keys = (self.model.id,) if order_by is None or order_by is self.model.id else (order_by, self.model.id)
+
+        stmt = select(self.model).where(*filters).options(*options)
+        if cursor is not None:
+            stmt = stmt.where(self._keyset_boundary(keys, decode_cursor(cursor, keys), descending))
+        stmt = stmt.order_by(*(key.desc() if descending else key.asc() for key in keys)).limit(limit + 1)
+
+        async with self.session as session:
+            result = await session.scalars(stmt)
+            rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(keys, [getattr(rows[-1], key.key) for key in keys])
+        return list(rows), next_cursor
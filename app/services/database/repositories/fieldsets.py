@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only, raiseload
+from sqlalchemy.orm.interfaces import MapperOption
+
+from app.services.database.models import BaseModel as DBModel
+from app.utils.serialization import trimmed_model
+
+
+class InvalidFieldSet(ValueError):
+    pass
+
+
+def _split(value: Optional[str]) -> Optional[frozenset[str]]:
+    if value is None:
+        return None
+    return frozenset(name.strip() for name in value.split(",") if name.strip())
+
+
+@dataclass(frozen=True)
+class FieldSet:
+    schema: Type[BaseModel]
+    relations: frozenset[str]
+    # None leaves that part unrestricted; asking for fields without include drops every relationship
+    fields: Optional[frozenset[str]] = None
+    include: Optional[frozenset[str]] = None
+
+    @classmethod
+    def parse(cls, schema: Type[BaseModel], relations: Iterable[str],
+              fields: Optional[str] = None, include: Optional[str] = None) -> "FieldSet":
+        fieldset = cls(schema, frozenset(relations), _split(fields), _split(include))
+        unknown = sorted((fieldset.fields or frozenset()) - fieldset.columns)
+        if unknown:
+            raise InvalidFieldSet(f"Unknown fields: {', '.join(unknown)}")
+        unknown = sorted((fieldset.include or frozenset()) - fieldset.relations)
+        if unknown:
+            raise InvalidFieldSet(f"Unknown relations to include: {', '.join(unknown)}")
+        return fieldset
+
+    @property
+    def columns(self) -> frozenset[str]:
+        return frozenset(self.schema.__fields__) - self.relations
+
+    @property
+    def is_full(self) -> bool:
+        return self.fields is None and self.include is None
+
+    @property
+    def key(self) -> str:
+        parts = (self.fields, self.include)
+        return "|".join("*" if part is None else ",".join(sorted(part)) for part in parts)
+
+    def includes(self, relation: str) -> bool:
+        if self.include is not None:
+            return relation in self.include
+        return self.fields is None
+
+    def selected(self) -> frozenset[str]:
+        # id is always returned, clients need it to address what they were given
+        columns = self.columns if self.fields is None else self.fields | {"id"}
+        return columns | {relation for relation in self.relations if self.includes(relation)}
+
+    def options(self, model: Type[DBModel], relation_options: Mapping[str, MapperOption],
+                required: Iterable[Any] = ()) -> list[MapperOption]:
+        # required columns are loaded but not returned, e.g. the key a cursor is built from
+        options: list[MapperOption] = []
+        if self.fields is not None:
+            columns = [getattr(model, name) for name in sorted(self.fields | {"id"})]
+            options.append(load_only(*columns, *(column for column in required if column.key not in self.fields)))
+        for relation, option in relation_options.items():
+            options.append(option if self.includes(relation) else raiseload(getattr(model, relation)))
+        return options
+
+    def response_model(self) -> Type[BaseModel]:
+        if self.is_full:
+            return self.schema
+        return trimmed_model(self.schema, self.selected())
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Hashable, Iterable, Mapping, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFunction = Callable[[list[K]], Awaitable[Mapping[K, V]]]
+
+
+# coalesces the loads issued in one event loop tick into a single batch call
+class BatchLoader(Generic[K, V]):
+    def __init__(self, batch_fn: BatchFunction, lock: asyncio.Lock, max_batch_size: int = 500) -> None:
+        self._batch_fn = batch_fn
+        self._lock = lock
+        self.max_batch_size = max_batch_size
+        self._pending: dict[K, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, key: K) -> Awaitable[Optional[V]]:
+        # concurrent loads of the same key share one future
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                # dispatched after every task that is already runnable has had a chance to add its key
+                loop.call_soon(self._dispatch)
+            future = self._pending[key] = loop.create_future()
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> list[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        for start in range(0, len(keys), self.max_batch_size):
+            batch = {key: pending[key] for key in keys[start:start + self.max_batch_size]}
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[K, asyncio.Future]) -> None:
+        try:
+            # a session runs one statement at a time, so batches of every loader take turns
+            async with self._lock:
+                values = await self._batch_fn(list(batch))
+        except Exception as error:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+def session_loader(session: AsyncSession, name: str, batch_fn: BatchFunction) -> BatchLoader:
+    # loaders live in the session's info dict, so they share the session's request scope;
+    # results are not memoized, so a load after a write always sees the new row
+    info: dict[str, Any] = session.info
+    loaders: dict[str, BatchLoader] = info.setdefault("batch_loaders", {})
+    loader = loaders.get(name)
+    if loader is None:
+        lock = info.setdefault("batch_loader_lock", asyncio.Lock())
+        loader = loaders[name] = BatchLoader(batch_fn, lock)
+    return loader
@@ -0,0 +1,4 @@
+from .order_repository import EmptyOrder, InsufficientStock, OrderRepository
+
+
+__all__ = ("EmptyOrder", "InsufficientStock", "OrderRepository")
@@ -0,0 +1,97 @@
+from decimal import Decimal
+from typing import AsyncIterator, Awaitable, Callable, Mapping, Optional, Sequence
+
+from sqlalchemy import Integer, RowMapping, column, insert, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.services.database.models import Order, OrderItem, Product
+from ..base import BaseRepository
+
+
+ORDER_STATUS_PENDING = "Pending"
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_ids: list[int]) -> None:
+        super().__init__(f"Not enough stock for products: {', '.join(map(str, product_ids))}")
+        self.product_ids = product_ids
+
+
+class EmptyOrder(Exception):
+    def __init__(self) -> None:
+        super().__init__("An order needs at least one line with a positive quantity")
+
+
+class OrderRepository(BaseRepository):
+    model = Order
+    # placing an order changes product stock, which listings render
+    cache_tags = ("orders", "products")
+
+    export_columns = ("id", "user_id", "status", "total_price", "address", "city", "country", "telephone",
+                      "created_at", "updated_at")
+
+    async def place_order(self, user_id: int, lines: Mapping[int, int], shipping: dict[str, str],
+                          before_commit: Optional[Callable[[AsyncSession, Order], Awaitable[None]]] = None) -> Order:
+        lines = {product_id: quantity for product_id, quantity in lines.items() if quantity > 0}
+        if not lines:
+            raise EmptyOrder()
+        products = Product.__table__
+        requested = values(column("product_id", Integer), column("quantity", Integer), name="requested").data(
+            sorted(lines.items()))
+        # lock the products in id order so concurrent checkouts over the same items queue instead of deadlocking
+        locked = select(products.c.id).where(products.c.id.in_(list(lines))).order_by(products.c.id).with_for_update()
+        remaining = products.c.quantity - requested.c.quantity
+
+        # core table statement: the ORM cannot RETURN columns of the joined VALUES list
+        decrement = update(products).where(
+            products.c.id == requested.c.product_id,
+            products.c.id.in_(locked),
+            products.c.in_stock.is_(True),
+            products.c.quantity >= requested.c.quantity
+        ).values(quantity=remaining, in_stock=remaining > 0).returning(
+            products.c.id, products.c.name, products.c.base_price, products.c.sale_price,
+            products.c.color_id, products.c.size_id, requested.c.quantity
+        )
+
+        async with self.session as session:
+            reserved = (await session.execute(decrement)).all()
+            if len(reserved) != len(lines):
+                await session.rollback()
+                raise InsufficientStock(sorted(set(lines) - {row.id for row in reserved}))
+
+            items = []
+            total_price = Decimal(0)
+            for row in reserved:
+                price = row.sale_price if row.sale_price is not None else row.base_price
+                total_price += price * row.quantity
+                items.append({"name": row.name, "product_id": row.id, "color_id": row.color_id,
+                              "size_id": row.size_id, "price": float(price), "quantity": row.quantity})
+
+            order = await session.scalar(insert(Order).values(
+                user_id=user_id, status=ORDER_STATUS_PENDING, total_price=float(total_price), **shipping
+            ).returning(Order))
+            # one multi-row INSERT for every line of the order
+            await session.execute(insert(OrderItem).values([{**item, "order_id": order.id} for item in items]))
+            # work that must exist exactly when the order does, like its follow-up job, commits with it
+            if before_commit is not None:
+                await before_commit(session, order)
+            await session.commit()
+
+        await self._invalidate_cache()
+        return await self.get_order_by_id(order.id)
+
+    async def get_order_by_id(self, id: int) -> Optional[Order]:
+        async with self.session as session:
+            stmt = select(Order).where(Order.id == id).options(selectinload(Order.items))
+            result = await session.scalar(stmt)
+        return result
+
+    async def get_orders_by_user(self, user_id: int, limit: int,
+                                 cursor: Optional[str] = None) -> tuple[list[Order], Optional[str]]:
+        return await self._keyset_pagination(limit=limit, cursor=cursor, descending=True,
+                                             filters=(Order.user_id == user_id,))
+
+    def stream_orders(self, batch_size: int = 1000) -> AsyncIterator[Sequence[RowMapping]]:
+        stmt = select(*(Order.__table__.c[name] for name in self.export_columns)).order_by(Order.id)
+        return self._stream(stmt, batch_size)
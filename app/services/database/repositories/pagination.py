@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Sequence
+
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(value: Any, column: InstrumentedAttribute) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is Decimal:
+        return Decimal(value)
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(keys: Sequence[InstrumentedAttribute], values: Sequence[Any]) -> str:
+    payload = {"k": [key.key for key in keys], "v": [_encode_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        names, values = payload["k"], payload["v"]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Malformed pagination cursor")
+
+    if names != [key.key for key in keys] or len(values) != len(keys):
+        raise InvalidCursor("Pagination cursor does not match the requested ordering")
+
+    try:
+        return [_decode_value(value, key) for value, key in zip(values, keys)]
+    except (ValueError, TypeError, ArithmeticError):
+        raise InvalidCursor("Malformed pagination cursor")
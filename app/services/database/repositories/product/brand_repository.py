@@ -1,25 +1,27 @@
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from typing import Any, Optional
 
-from app.services.database.models import Brand, Product
-from app.services.database.schemas.product import BrandDTO
+from app.services.database.models import Brand
+from app.services.database.schemas.product import BrandDTO, ProductSortKey
 from ..base import BaseRepository
+from ..fieldsets import FieldSet
+from .product_repository import ProductRepository
 
 
 class BrandRepository(BaseRepository):
     model = Brand
+    cache_tags = ("brands",)
 
     async def create_brand(self, brand: BrandDTO) -> Brand:
         return await self._insert(**brand.dict(exclude_unset=True, exclude_none=True))
 
-    async def get_brand_by_id(self, id: int) -> Brand:
-        return await self._select_one(Brand.id == id)
+    async def get_brand_by_id(self, id: int) -> Optional[BrandDTO]:
+        return await self._select_by_id(id)
 
-    async def get_brand_by_name(self, name: str) -> Brand:
-        return await self._select_one(Brand.name == name)
+    async def get_brand_by_name(self, name: str) -> Optional[BrandDTO]:
+        return await self._select_by_name(name)
 
-    async def get_all_brands(self) -> list[Brand]:
-        return await self._select_all()
+    async def get_all_brands(self) -> list[BrandDTO]:
+        return await self._select_all_cached()
 
     async def update_brand(self, brand: BrandDTO) -> Brand:
         brand_data = brand.dict(exclude_unset=True, exclude_none=True)
@@ -28,15 +30,15 @@ class BrandRepository(BaseRepository):
     async def delete_brand(self, id: int) -> Brand:
         return await self._delete(Brand.id == id)
 
-    async def get_brand_with_products(self, brand_name: str, offset: int, limit: int) -> Brand:
-        async with self.session as session:
-            stmt = select(Brand).where(Brand.name == brand_name).options(
-                joinedload(Brand.products)
-                .joinedload(Product.color),
-                joinedload(Brand.products)
-                .joinedload(Product.size),
-                joinedload(Brand.products)
-                .joinedload(Product.ratings)
-            ).offset(offset).limit(limit)
-            result = await session.scalar(stmt)
-        return result
+    async def get_brand_with_products(self, brand_name: str, limit: int, cursor: Optional[str] = None,
+                                      sort: ProductSortKey = ProductSortKey.id, descending: bool = False,
+                                      fieldset: Optional[FieldSet] = None) -> Optional[dict[str, Any]]:
+        brand = await self.get_brand_by_name(name=brand_name)
+        if not brand:
+            return None
+
+        products, next_cursor = await ProductRepository(self.session).get_products_by_brand(
+            brand_id=brand.id, limit=limit, cursor=cursor, sort=sort, descending=descending, fieldset=fieldset)
+
+        # products are left as rows, so the endpoint can render them with the requested fieldset
+        return {**BrandDTO.from_orm(brand).dict(), "products": products, "next_cursor": next_cursor}
@@ -1,28 +1,26 @@
-from sqlalchemy.orm import joinedload
+from typing import Any, Optional
 from app.services.database.models import Category
-from app.services.database.models import Product
-from app.services.database.schemas.product import CategoryDTO
+from app.services.database.schemas.product import CategoryDTO, ProductSortKey
 from ..base import BaseRepository
-from sqlalchemy import select
+from ..fieldsets import FieldSet
+from .product_repository import ProductRepository
 
 
 class CategoryRepository(BaseRepository):
     model = Category
+    cache_tags = ("categories",)
 
     async def create_category(self, category: CategoryDTO) -> Category:
         return await self._insert(**category.dict(exclude_unset=True, exclude_none=True))
 
-    async def get_category_by_id(self, id: int) -> Category:
-        return await self._select_one(Category.id == id)
+    async def get_category_by_id(self, id: int) -> Optional[CategoryDTO]:
+        return await self._select_by_id(id)
 
-    async def get_category_by_name(self, category_name: str) -> Category:
-        async with self.session as session:
-            stmt = select(Category).where(Category.name == category_name)
-            result = await session.scalar(stmt)
-        return result
+    async def get_category_by_name(self, category_name: str) -> Optional[CategoryDTO]:
+        return await self._select_by_name(category_name)
 
-    async def get_all_categories(self) -> list[Category]:
-        return await self._select_all()
+    async def get_all_categories(self) -> list[CategoryDTO]:
+        return await self._select_all_cached()
 
     async def update_category(self, category: CategoryDTO) -> Category:
         category_data = category.dict(exclude_unset=True, exclude_none=True)
@@ -31,15 +29,15 @@ class CategoryRepository(BaseRepository):
     async def delete_category(self, id: int) -> Category:
         return await self._delete(Category.id == id)
 
-    async def get_category_with_products(self, category_name: str, offset: int, limit: int):
-        async with self.session as session:
-            stmt = select(Category).where(Category.name == category_name).options(
-                joinedload(Category.products)
-                .joinedload(Product.color),
-                joinedload(Category.products)
-                .joinedload(Product.size),
-                joinedload(Category.products)
-                .joinedload(Product.ratings)
-            ).offset(offset).limit(limit)
-            result = await session.scalar(stmt)
-        return result
+    async def get_category_with_products(self, category_name: str, limit: int, cursor: Optional[str] = None,
+                                         sort: ProductSortKey = ProductSortKey.id, descending: bool = False,
+                                         fieldset: Optional[FieldSet] = None) -> Optional[dict[str, Any]]:
+        category = await self.get_category_by_name(category_name=category_name)
+        if not category:
+            return None
+
+        products, next_cursor = await ProductRepository(self.session).get_products_by_category(
+            category_id=category.id, limit=limit, cursor=cursor, sort=sort, descending=descending, fieldset=fieldset)
+
+        # products are left as rows, so the endpoint can render them with the requested fieldset
+        return {**CategoryDTO.from_orm(category).dict(), "products": products, "next_cursor": next_cursor}
@@ -1,24 +1,41 @@
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from app.services.database.models import Product, Color, Size
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Sequence
+from sqlalchemy import Float, RowMapping, Select, and_, cast, func, or_, select, true, tuple_
+from sqlalchemy.orm import aliased, joinedload, load_only, selectinload
+from app.services.database.models import Brand, Category, Product, Color, Size, RatingSummary
+from app.services.database.models.product import SEARCH_CONFIG
 from ..base import BaseRepository
-from app.services.database.schemas.product import ProductCreate, ProductUpdate, ProductResponse, SizeDTO, ColorDTO
+from ..fieldsets import FieldSet
+from ..pagination import decode_cursor, encode_cursor
+from app.services.database.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductSortKey, ProductFilter, ProductFacets, SizeDTO, ColorDTO
+
+
+# aliased so the graph can also be joined onto queries that already select from these tables
+_graph_category = aliased(Category)
+_graph_brand = aliased(Brand)
+_graph_color = aliased(Color)
+_graph_size = aliased(Size)
+_graph_rating_summary = aliased(RatingSummary)
 
 
 class SizeRepository(BaseRepository):
     model = Size
+    cache_tags = ("sizes",)
 
     async def create_product_size(self, size: SizeDTO) -> Size:
         return await self._insert(**size.dict(exclude_unset=True, exclude_none=True))
 
-    async def get_product_size_by_id(self, id: int) -> Size:
-        return await self._select_one(Size.id == id)
+    async def get_product_size_by_id(self, id: int) -> Optional[SizeDTO]:
+        return await self._select_by_id(id)
+
+    async def get_product_size_last_modified(self, id: int) -> Optional[datetime]:
+        return await self._select_last_modified(Size.id == id)
 
-    async def get_product_size_by_name(self, name: str) -> Size:
-        return await self._select_one(Size.name == name)
+    async def get_product_size_by_name(self, name: str) -> Optional[SizeDTO]:
+        return await self._select_by_name(name)
 
-    async def get_all_product_sizes(self) -> list[Size]:
-        return await self._select_all()
+    async def get_all_product_sizes(self) -> list[SizeDTO]:
+        return await self._select_all_cached()
 
     async def update_product_size(self, size: SizeDTO) -> Size:
         size_data = size.dict(exclude_unset=True, exclude_none=True)
@@ -30,18 +47,22 @@ class SizeRepository(BaseRepository):
 
 class ColorRepository(BaseRepository):
     model = Color
+    cache_tags = ("colors",)
 
     async def create_product_color(self, color: ColorDTO) -> Color:
         return await self._insert(**color.dict(exclude_unset=True, exclude_none=True))
 
-    async def get_product_color_by_id(self, id: int) -> Color:
-        return await self._select_one(Color.id == id)
+    async def get_product_color_by_id(self, id: int) -> Optional[ColorDTO]:
+        return await self._select_by_id(id)
 
-    async def get_product_color_by_name(self, name: str) -> Color:
-        return await self._select_one(Color.name == name)
+    async def get_product_color_last_modified(self, id: int) -> Optional[datetime]:
+        return await self._select_last_modified(Color.id == id)
 
-    async def get_all_product_colors(self) -> list[Color]:
-        return await self._select_all()
+    async def get_product_color_by_name(self, name: str) -> Optional[ColorDTO]:
+        return await self._select_by_name(name)
+
+    async def get_all_product_colors(self) -> list[ColorDTO]:
+        return await self._select_all_cached()
 
     async def update_product_color(self, color: ColorDTO) -> Color:
         color_data = color.dict(exclude_unset=True, exclude_none=True)
@@ -53,22 +74,138 @@ class ColorRepository(BaseRepository):
 
 class ProductRepository(BaseRepository):
     model = Product
+    cache_tags = ("products",)
+    # tags of every table a rendered product reads from
+    listing_cache_tags = ("products", "categories", "brands", "colors", "sizes", "ratings")
+
+    sort_keys = {
+        ProductSortKey.id: Product.id,
+        ProductSortKey.name: Product.name,
+        ProductSortKey.base_price: Product.base_price,
+        ProductSortKey.sale_price: Product.sale_price,
+        ProductSortKey.created_at: Product.created_at,
+    }
+
+    # every relation rendered in a listing is many-to-one, so joining them keeps
+    # one row per product and LIMIT still bounds the page to `limit` products
+    relation_options = {
+        "category": joinedload(Product.category),
+        "brand": joinedload(Product.brand),
+        "color": joinedload(Product.color),
+        "size": joinedload(Product.size),
+        "rating_summary": joinedload(Product.rating_summary),
+    }
+    listing_options = tuple(relation_options.values())
+
+    # the columns a cart or checkout needs to price and stock-check a line
+    snapshot_options = (
+        load_only(Product.id, Product.name, Product.base_price, Product.sale_price,
+                  Product.in_stock, Product.quantity),
+    )
+
+    # dimensions counted by get_product_facets; each one ignores its own filter
+    # so a client can see what selecting a different value would return
+    facet_columns = {
+        "category_id": Product.category_id,
+        "brand_id": Product.brand_id,
+        "color_id": Product.color_id,
+        "size_id": Product.size_id,
+        "in_stock": Product.in_stock,
+    }
+
+    # lookups are exported by name, so an export can be fed back into the importer as-is
+    export_columns = ("id", "name", "base_price", "sale_price", "description", "in_stock", "quantity",
+                      "category", "brand", "color", "size", "rating_count", "created_at", "updated_at")
 
     async def create_product(self, product: ProductCreate) -> Product:
         new_product = await self._insert(**product.dict(exclude_unset=True, exclude_none=True))
         return await self.get_product_by_id(id=new_product.id)
 
-    async def get_product_by_id(self, id: int) -> ProductResponse:
+    @classmethod
+    def fieldset(cls, fields: Optional[str] = None, include: Optional[str] = None) -> FieldSet:
+        return FieldSet.parse(ProductResponse, cls.relation_options, fields=fields, include=include)
+
+    def fieldset_options(self, fieldset: Optional[FieldSet] = None, required: Sequence[Any] = ()) -> Sequence[Any]:
+        if fieldset is None or fieldset.is_full:
+            return self.listing_options
+        return fieldset.options(Product, self.relation_options, required=required)
+
+    async def get_product_by_id(self, id: int, fieldset: Optional[FieldSet] = None) -> ProductResponse:
+        # concurrent lookups within a request become one query for all of them
+        if fieldset is None or fieldset.is_full:
+            return await self._loader("products", self._products_by_ids).load(id)
+
+        options = self.fieldset_options(fieldset)
+
+        async def products_by_ids(ids: list[int]) -> dict[int, Product]:
+            return await self._products_by_ids(ids, options)
+        return await self._loader(f"products:{fieldset.key}", products_by_ids).load(id)
+
+    async def _products_by_ids(self, ids: list[int],
+                               options: Optional[Sequence[Any]] = None) -> dict[int, Product]:
+        return {product.id: product for product in await self.get_products_by_ids(ids, options)}
+
+    async def get_products_by_ids(self, ids: Sequence[int],
+                                  options: Optional[Sequence[Any]] = None) -> list[Product]:
+        if not ids:
+            return []
+        async with self.session as session:
+            stmt = select(Product).where(Product.id.in_(set(ids))).options(
+                *(self.listing_options if options is None else options))
+            result = await session.scalars(stmt)
+        return list(result.all())
+
+    def stream_products(self, filters: Sequence[Any] = (),
+                        batch_size: int = 1000) -> AsyncIterator[Sequence[RowMapping]]:
+        stmt = self.join_graph(select(
+            Product.id, Product.name, Product.base_price, Product.sale_price, Product.description,
+            Product.in_stock, Product.quantity,
+            _graph_category.name.label("category"),
+            _graph_brand.name.label("brand"),
+            _graph_color.name.label("color"),
+            _graph_size.name.label("size"),
+            func.coalesce(_graph_rating_summary.rating_count, 0).label("rating_count"),
+            Product.created_at, Product.updated_at,
+        ).select_from(Product)).where(*filters).order_by(Product.id)
+        return self._stream(stmt, batch_size)
+
+    @classmethod
+    def graph_last_modified(cls) -> Any:
+        return func.greatest(
+            cls._last_modified(Product),
+            cls._last_modified(_graph_category),
+            cls._last_modified(_graph_brand),
+            cls._last_modified(_graph_color),
+            cls._last_modified(_graph_size),
+            _graph_rating_summary.updated_at
+        )
+
+    @staticmethod
+    def join_graph(stmt: Select) -> Select:
+        return stmt.outerjoin(Product.category.of_type(_graph_category)).outerjoin(
+            Product.brand.of_type(_graph_brand)).outerjoin(
+            Product.color.of_type(_graph_color)).outerjoin(
+            Product.size.of_type(_graph_size)).outerjoin(
+            Product.rating_summary.of_type(_graph_rating_summary))
+
+    async def get_product_last_modified(self, id: int) -> Optional[datetime]:
         async with self.session as session:
-            stmt = select(Product).where(Product.id == id).options(selectinload(Product.category), selectinload(
-                Product.brand), selectinload(Product.color), selectinload(Product.size), selectinload(Product.ratings))
+            stmt = self.join_graph(select(self.graph_last_modified()).select_from(Product)).where(Product.id == id)
+            result = await session.scalar(stmt)
+        return result
+
+    async def get_products_last_modified(self, ids: Sequence[int]) -> Optional[datetime]:
+        if not ids:
+            return None
+        async with self.session as session:
+            stmt = self.join_graph(select(func.max(self.graph_last_modified())).select_from(Product)).where(Product.id.in_(ids))
             result = await session.scalar(stmt)
         return result
 
     async def get_product_by_name(self, name: str) -> Product:
         async with self.session as session:
             stmt = select(Product).where(Product.name == name).options(selectinload(Product.category), selectinload(
-                Product.brand), selectinload(Product.color), selectinload(Product.size), selectinload(Product.ratings))
+                Product.brand), selectinload(Product.color), selectinload(Product.size), selectinload(Product.rating_summary))
             result = await session.scalar(stmt)
         return result
 
@@ -80,14 +217,107 @@ class ProductRepository(BaseRepository):
     async def delete_product(self, id: int) -> Product:
         return await self._delete(Product.id == id)
 
-    async def get_all_products(self, offset: int, limit: int) -> list[Product]:
+    @staticmethod
+    def _filter_clauses(filters: ProductFilter) -> dict[str, list[Any]]:
+        clauses: dict[str, list[Any]] = {"base_price": [], "sale_price": []}
+        if filters.min_price is not None:
+            clauses["base_price"].append(Product.base_price >= filters.min_price)
+        if filters.max_price is not None:
+            clauses["base_price"].append(Product.base_price <= filters.max_price)
+        if filters.min_sale_price is not None:
+            clauses["sale_price"].append(Product.sale_price >= filters.min_sale_price)
+        if filters.max_sale_price is not None:
+            clauses["sale_price"].append(Product.sale_price <= filters.max_sale_price)
+        for name, column in ProductRepository.facet_columns.items():
+            value = getattr(filters, name)
+            clauses[name] = [column == value] if value is not None else []
+        return clauses
+
+    @classmethod
+    def filter_clauses(cls, filters: ProductFilter) -> list[Any]:
+        return [clause for clauses in cls._filter_clauses(filters).values() for clause in clauses]
+
+    async def get_all_products(self, limit: int, cursor: Optional[str] = None, sort: ProductSortKey = ProductSortKey.id,
+                               descending: bool = False, filters: Sequence[Any] = (),
+                               fieldset: Optional[FieldSet] = None) -> tuple[list[Product], Optional[str]]:
+        order_by = self.sort_keys[sort]
+        return await self._keyset_pagination(
+            limit=limit,
+            cursor=cursor,
+            order_by=order_by,
+            descending=descending,
+            filters=filters,
+            options=self.fieldset_options(fieldset, required=(order_by,))
+        )
+
+    async def get_products_by_brand(self, brand_id: int, limit: int, cursor: Optional[str] = None,
+                                    sort: ProductSortKey = ProductSortKey.id, descending: bool = False,
+                                    fieldset: Optional[FieldSet] = None) -> tuple[list[Product], Optional[str]]:
+        return await self.get_all_products(limit=limit, cursor=cursor, sort=sort, descending=descending,
+                                           filters=(Product.brand_id == brand_id,), fieldset=fieldset)
+
+    async def get_products_by_category(self, category_id: int, limit: int, cursor: Optional[str] = None,
+                                       sort: ProductSortKey = ProductSortKey.id, descending: bool = False,
+                                       fieldset: Optional[FieldSet] = None) -> tuple[list[Product], Optional[str]]:
+        return await self.get_all_products(limit=limit, cursor=cursor, sort=sort, descending=descending,
+                                           filters=(Product.category_id == category_id,), fieldset=fieldset)
+
+    async def get_product_facets(self, filters: ProductFilter) -> ProductFacets:
+        clauses = self._filter_clauses(filters)
+        # the sale price range is not a facet, so it can narrow the scan for every count
+        common = clauses.pop("sale_price")
+
+        def matching(*excluded: str) -> Any:
+            return and_(true(), *(clause for name, group in clauses.items() if name not in excluded for clause in group))
+
+        stmt = select(
+            *self.facet_columns.values(),
+            *(func.grouping(column).label(f"{name}_grouping") for name, column in self.facet_columns.items()),
+            *(func.count().filter(matching(name)).label(f"{name}_count") for name in self.facet_columns),
+            func.count().filter(matching()).label("total"),
+            func.min(Product.base_price).filter(matching("base_price")).label("min_price"),
+            func.max(Product.base_price).filter(matching("base_price")).label("max_price"),
+        ).where(*common).group_by(func.grouping_sets(*self.facet_columns.values(), tuple_()))
+
         async with self.session as session:
-            stmt = select(Product).options(
-                selectinload(Product.category),
-                selectinload(Product.brand),
-                selectinload(Product.color),
-                selectinload(Product.size),
-                selectinload(Product.ratings)
-            ).offset(offset).limit(limit)
-            result = await session.scalars(stmt)
-        return result.all()
+            rows = (await session.execute(stmt)).all()
+
+        facets: dict[str, Any] = {name: [] for name in self.facet_columns}
+        facets.update(total=0, price={"min": None, "max": None})
+        for row in rows:
+            for name in self.facet_columns:
+                if getattr(row, f"{name}_grouping") == 0:
+                    count = getattr(row, f"{name}_count")
+                    if count:
+                        facets[name].append({"value": getattr(row, name), "count": count})
+                    break
+            else:
+                facets.update(total=row.total, price={"min": row.min_price, "max": row.max_price})
+
+        for name in self.facet_columns:
+            facets[name].sort(key=lambda facet: -facet["count"])
+        return ProductFacets.parse_obj(facets)
+
+    async def search_products(self, query: str, limit: int, cursor: Optional[str] = None,
+                              fieldset: Optional[FieldSet] = None) -> tuple[list[Product], Optional[str]]:
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = cast(func.ts_rank_cd(Product.search_vector, ts_query) + func.similarity(Product.name, query), Float)
+        keys = (rank.label("rank"), Product.id)
+
+        stmt = select(Product, keys[0]).where(
+            or_(Product.search_vector.op("@@")(ts_query), Product.name.op("%")(query))
+        ).options(*self.fieldset_options(fieldset))
+        if cursor is not None:
+            last_rank, last_id = decode_cursor(cursor, keys)
+            stmt = stmt.where(tuple_(rank, Product.id) < tuple_(last_rank, last_id))
+        stmt = stmt.order_by(rank.desc(), Product.id.desc()).limit(limit + 1)
+
+        async with self.session as session:
+            result = await session.execute(stmt)
+            rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(keys, [rows[-1].rank, rows[-1].Product.id])
+        return [row.Product for row in rows], next_cursor
@@ -1,13 +1,53 @@
-from app.services.database.models import Rating
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.database.models import Rating, RatingSummary
 from app.services.database.schemas.product import RatingDTO
 from ..base import BaseRepository
 
 
 class RatingRepository(BaseRepository):
     model = Rating
+    cache_tags = ("ratings",)
+
+    @staticmethod
+    async def _apply_summary_delta(session: AsyncSession, product_id: int, added: Optional[float] = None,
+                                   removed: Optional[float] = None) -> None:
+        delta = {"rating_count": 0, "stars_total": 0.0}
+        delta.update({f"stars_{star}": 0 for star in range(1, 6)})
+
+        if added is not None:
+            delta["rating_count"] += 1
+            delta["stars_total"] += added
+            delta[f"stars_{RatingSummary.bucket(added)}"] += 1
+        if removed is not None:
+            delta["rating_count"] -= 1
+            delta["stars_total"] -= removed
+            delta[f"stars_{RatingSummary.bucket(removed)}"] -= 1
+
+        changed = {column: value for column, value in delta.items() if value}
+        if not changed:
+            return
+
+        stmt = pg_insert(RatingSummary).values(product_id=product_id, **delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RatingSummary.product_id],
+            set_={**{column: getattr(RatingSummary, column) + value for column, value in changed.items()},
+                  "updated_at": func.now()}
+        )
+        await session.execute(stmt)
 
     async def create_rating(self, rating: RatingDTO) -> Rating:
-        return await self._insert(**rating.dict(exclude_unset=True, exclude_none=True))
+        async with self.session as session:
+            stmt = insert(Rating).values(**rating.dict(exclude_unset=True, exclude_none=True)).returning(Rating)
+            new_rating = await session.scalar(stmt)
+            await self._apply_summary_delta(session, new_rating.product_id, added=new_rating.stars)
+            await session.commit()
+        await self._invalidate_cache()
+        return new_rating
 
     async def get_rating_by_id(self, id: int) -> Rating:
         return await self._select_one(Rating.id == id)
@@ -18,9 +58,64 @@ class RatingRepository(BaseRepository):
     async def get_all_ratings(self) -> list[Rating]:
         return await self._select_all()
 
+    async def get_ratings_by_product(self, product_id: int, limit: int,
+                                     cursor: Optional[str] = None) -> tuple[list[Rating], Optional[str]]:
+        return await self._keyset_pagination(limit=limit, cursor=cursor, descending=True,
+                                             filters=(Rating.product_id == product_id,))
+
     async def update_rating(self, rating: RatingDTO) -> Rating:
         rating_data = rating.dict(exclude_unset=True, exclude_none=True)
-        return await self._update(Rating.id == rating.id, **rating_data)
+        async with self.session as session:
+            old_rating = await session.execute(
+                select(Rating.product_id, Rating.stars).where(Rating.id == rating.id).with_for_update())
+            old_rating = old_rating.one_or_none()
+
+            stmt = update(Rating).where(Rating.id == rating.id).values(**rating_data).returning(Rating)
+            updated_rating = await session.scalar(stmt)
+
+            if old_rating is not None and updated_rating is not None:
+                if old_rating.product_id == updated_rating.product_id:
+                    await self._apply_summary_delta(session, updated_rating.product_id,
+                                                    added=updated_rating.stars, removed=old_rating.stars)
+                else:
+                    await self._apply_summary_delta(session, old_rating.product_id, removed=old_rating.stars)
+                    await self._apply_summary_delta(session, updated_rating.product_id, added=updated_rating.stars)
+            await session.commit()
+        await self._invalidate_cache()
+        return updated_rating
 
     async def delete_rating(self, id: int) -> Rating:
-        return await self._delete(Rating.id == id)
+        async with self.session as session:
+            stmt = delete(Rating).where(Rating.id == id).returning(Rating)
+            deleted_rating = await session.scalar(stmt)
+            if deleted_rating is not None:
+                await self._apply_summary_delta(session, deleted_rating.product_id, removed=deleted_rating.stars)
+            await session.commit()
+        await self._invalidate_cache()
+        return deleted_rating
+
+    async def refresh_rating_summary(self, product_id: int) -> None:
+        buckets = {
+            f"stars_{star}": func.count().filter(
+                func.least(5, func.greatest(1, func.floor(Rating.stars + 0.5))) == star)
+            for star in range(1, 6)
+        }
+        async with self.session as session:
+            aggregate = select(
+                Rating.product_id,
+                func.count().label("rating_count"),
+                func.coalesce(func.sum(Rating.stars), 0).label("stars_total"),
+                *(column.label(name) for name, column in buckets.items())
+            ).where(Rating.product_id == product_id).group_by(Rating.product_id)
+
+            row = (await session.execute(aggregate)).one_or_none()
+            values = {"rating_count": 0, "stars_total": 0.0, **{name: 0 for name in buckets}}
+            if row is not None:
+                values = {name: getattr(row, name) for name in values}
+
+            stmt = pg_insert(RatingSummary).values(product_id=product_id, **values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[RatingSummary.product_id], set_={**values, "updated_at": func.now()})
+            await session.execute(stmt)
+            await session.commit()
+        await self._invalidate_cache()
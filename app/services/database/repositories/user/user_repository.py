@@ -1,53 +1,81 @@
-from typing import Any, Sequence
+from typing import Any, AsyncIterator, Optional, Sequence
+from sqlalchemy import RowMapping, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.database.models import User
-from app.services.database.schemas.user import UserCreate, UserUpdate, GrantSuperUser
+from app.services.database.schemas.user import UserCreate, UserResponse, UserUpdate, GrantSuperUser
 from ..base import BaseRepository
-from app.utils.password_hashing import pwd_context
+from ..fieldsets import FieldSet
+from app.utils.password_hashing import password_hasher
+from app.services.security.principal_cache import principal_cache
 
 
 class UserRepository(BaseRepository):
     model = User
+    # hashed_password is never exported
+    export_columns = ("id", "username", "full_name", "email", "is_active", "is_superuser",
+                      "address", "city", "country", "telephone", "created_at", "updated_at")
 
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session)
-        self._password_hasher = pwd_context
+        self._password_hasher = password_hasher
 
     async def create_user(self, user: UserCreate) -> User:
-        user.hashed_password = self._password_hasher.hash(user.password)
+        user.hashed_password = await self._password_hasher.hash(user.password)
         del user.password
         return await self._insert(**user.dict(exclude_unset=True, exclude_none=True))
 
     async def update_user(self, user: UserUpdate) -> User:
-        user.hashed_password = user.password
+        if user.password is not None:
+            user.hashed_password = await self._password_hasher.hash(user.password)
         del user.password
-        return await self._update(User.id == user.id, **user.dict(exclude_unset=True, exclude_none=True))
+        updated_user = await self._update(User.id == user.id, **user.dict(exclude_unset=True, exclude_none=True))
+        await principal_cache.invalidate(user.id)
+        return updated_user
 
     async def get_user_by_email(self, email: str) -> User:
         return await self._select_one(User.email == email)
 
-    async def get_user_by_id(self, id: int) -> User:
-        return await self._select_one(User.id == id)
+    @staticmethod
+    def fieldset(fields: Optional[str] = None, include: Optional[str] = None) -> FieldSet:
+        return FieldSet.parse(UserResponse, (), fields=fields, include=include)
 
-    async def get_all_users(self) -> Sequence[User]:
-        return await self._select_all()
+    async def get_user_by_id(self, id: int, fieldset: Optional[FieldSet] = None) -> User:
+        options = fieldset.options(User, {}) if fieldset is not None else ()
+        return await self._select_one(User.id == id, options=options)
+
+    async def get_all_users(self, fieldset: Optional[FieldSet] = None) -> Sequence[User]:
+        options = fieldset.options(User, {}) if fieldset is not None else ()
+        return await self._select_all(options=options)
+
+    def stream_users(self, batch_size: int = 1000) -> AsyncIterator[Sequence[RowMapping]]:
+        stmt = select(*(User.__table__.c[name] for name in self.export_columns)).order_by(User.id)
+        return self._stream(stmt, batch_size)
 
     async def activate_user(self, user: UserUpdate) -> User:
         payload = {"is_active": True}
-        return await self._update(User.id == user.id, **payload)
+        activated_user = await self._update(User.id == user.id, **payload)
+        await principal_cache.invalidate(user.id)
+        return activated_user
 
     async def deactivate_user(self, user: UserUpdate) -> User:
         payload = {"is_active": False}
-        return await self._update(User.id == user.id, **payload)
+        deactivated_user = await self._update(User.id == user.id, **payload)
+        await principal_cache.invalidate(user.id)
+        return deactivated_user
 
     async def delete_user(self, user: UserUpdate) -> User:
-        return await self._delete(User.id == user.id)
+        deleted_user = await self._delete(User.id == user.id)
+        await principal_cache.invalidate(user.id)
+        return deleted_user
 
     async def password_change_user(self, user: UserUpdate) -> User:
         payload = {
-            "hashed_password": self._password_hasher.hash(user.password)}
+            "hashed_password": await self._password_hasher.hash(user.password)}
         return await self._update(User.id == user.id, **payload)
 
     async def grant_admin_privileges(self, user: GrantSuperUser) -> User:
-        return await self._update(User.email == user.email, **user.dict())
+        superuser = await self._update(User.email == user.email, **user.dict())
+        if superuser is not None:
+            await principal_cache.invalidate(superuser.id)
+        return superuser
@@ -0,0 +1,4 @@
+from .cart import CartItemAdd, CartItemUpdate, CartLine, CartResponse
+
+
+__all__ = ("CartItemAdd", "CartItemUpdate", "CartLine", "CartResponse")
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from pydantic import BaseModel, conint
+
+from app.config.settings import settings
+
+
+class CartItemUpdate(BaseModel):
+    product_id: int
+    quantity: conint(ge=0, le=settings.CART_MAX_QUANTITY) = 1
+
+    class Config:
+        schema_extra = {
+            "product_id": 1,
+            "quantity": 2
+        }
+
+
+class CartItemAdd(CartItemUpdate):
+    # adding nothing is not an add; setting a line to 0 through CartItemUpdate removes it
+    quantity: conint(ge=1, le=settings.CART_MAX_QUANTITY) = 1
+
+
+class CartLine(BaseModel):
+    product_id: int
+    name: Optional[str]
+    quantity: int
+    unit_price: Optional[float]
+    in_stock: bool
+    available: bool
+    line_total: Optional[float]
+
+
+class CartResponse(BaseModel):
+    cart_id: Optional[str]
+    items: list[CartLine]
+    total_quantity: int
+    total_price: float
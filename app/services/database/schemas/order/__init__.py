@@ -1,4 +1,4 @@
-from .order import OrderBodySpec, OrderDTO, OrderItemDTO
+from .order import OrderBodySpec, OrderDTO, OrderItemDTO, OrderCreate, OrderResponse, OrderPage
 
 
-__all__ = ("OrderBodySpec", "OrderDTO", "OrderItemDTO")
+__all__ = ("OrderBodySpec", "OrderDTO", "OrderItemDTO", "OrderCreate", "OrderResponse", "OrderPage")
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Any, Optional
 
 from fastapi import Body
@@ -47,7 +48,37 @@ class OrderItemDTO(BaseModel):
     id: Optional[int]
     name: str
     order_id: int
-    color_id: int
-    size_id: int
+    product_id: Optional[int]
+    color_id: Optional[int]
+    size_id: Optional[int]
     price: float
     quantity: int
+
+    class Config:
+        orm_mode = True
+
+
+class OrderCreate(BaseModel):
+    # anything left out is taken from the customer's profile
+    address: Optional[str]
+    city: Optional[str]
+    country: Optional[str]
+    telephone: Optional[str]
+
+    class Config:
+        schema_extra = {
+            "address": "1790 Broadway, NY 10019",
+            "city": "New York",
+            "country": "USA",
+            "telephone": "+1 (360) 921-2552"
+        }
+
+
+class OrderResponse(OrderDTO):
+    created_at: Optional[datetime]
+    items: list[OrderItemDTO]
+
+
+class OrderPage(BaseModel):
+    items: list[OrderDTO]
+    next_cursor: Optional[str]
@@ -1,8 +1,10 @@
 from .brand import BrandDTO, BrandResponse
 from .category import CategoryDTO, CategoryResponse
-from .rating import RatingDTO
-from .product import SizeDTO, ColorDTO, ProductBase, ProductCreate, ProductUpdate, ProductResponse
+from .rating import RatingDTO, RatingSummaryDTO, RatingPage
+from .product import SizeDTO, ColorDTO, ProductBase, ProductCreate, ProductUpdate, ProductResponse, ProductSortKey, ProductPage, \
+    ProductBatch, ProductFilter, ProductFacets, FacetCount, StockFacetCount, PriceRange
 
 
-__all__ = ("BrandDTO", "BrandResponse", "CategoryDTO", "CategoryResponse", "RatingDTO", "SizeDTO", "ColorDTO",
-           "ProductBase", "ProductCreate", "ProductUpdate", "ProductResponse")
+__all__ = ("BrandDTO", "BrandResponse", "CategoryDTO", "CategoryResponse", "RatingDTO", "RatingSummaryDTO", "RatingPage", "SizeDTO", "ColorDTO",
+           "ProductBase", "ProductCreate", "ProductUpdate", "ProductResponse", "ProductSortKey", "ProductPage",
+           "ProductBatch", "ProductFilter", "ProductFacets", "FacetCount", "StockFacetCount", "PriceRange")
@@ -1,4 +1,4 @@
-from typing import Any, Optional
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -16,4 +16,5 @@ class BrandDTO(BaseModel):
 
 
 class BrandResponse(BrandDTO):
-    products: list[Any]
+    products: list["ProductResponse"]
+    next_cursor: Optional[str]
@@ -1,4 +1,4 @@
-from typing import Any, Optional
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -14,4 +14,5 @@ class CategoryDTO(BaseModel):
 
 
 class CategoryResponse(CategoryDTO):
-    products: list[Any]
+    products: list["ProductResponse"]
+    next_cursor: Optional[str]
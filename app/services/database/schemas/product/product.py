@@ -1,11 +1,12 @@
 from datetime import datetime
-from typing import Optional, Sequence
+from enum import Enum
+from typing import Optional
 
 from pydantic import BaseModel
 
-from .category import CategoryDTO
-from .brand import BrandDTO
-from .rating import RatingDTO
+from .category import CategoryDTO, CategoryResponse
+from .brand import BrandDTO, BrandResponse
+from .rating import RatingSummaryDTO
 
 
 class SizeDTO(BaseModel):
@@ -79,9 +80,68 @@ class ProductResponse(ProductBase):
     brand: Optional[BrandDTO]
     color: Optional[ColorDTO]
     size: Optional[SizeDTO]
-    ratings: Optional[Sequence[RatingDTO]]
+    rating_summary: Optional[RatingSummaryDTO]
 
     class Config:
         schema_extra = {
             "id": 15
         }
+
+
+class ProductSortKey(str, Enum):
+    id = "id"
+    name = "name"
+    base_price = "base_price"
+    sale_price = "sale_price"
+    created_at = "created_at"
+
+
+class ProductPage(BaseModel):
+    items: list[ProductResponse]
+    next_cursor: Optional[str]
+
+
+class ProductBatch(BaseModel):
+    items: list[ProductResponse]
+    missing: list[int]
+
+
+class ProductFilter(BaseModel):
+    min_price: Optional[float]
+    max_price: Optional[float]
+    min_sale_price: Optional[float]
+    max_sale_price: Optional[float]
+    category_id: Optional[int]
+    brand_id: Optional[int]
+    color_id: Optional[int]
+    size_id: Optional[int]
+    in_stock: Optional[bool]
+
+
+class FacetCount(BaseModel):
+    value: Optional[int]
+    count: int
+
+
+class StockFacetCount(BaseModel):
+    value: bool
+    count: int
+
+
+class PriceRange(BaseModel):
+    min: Optional[float]
+    max: Optional[float]
+
+
+class ProductFacets(BaseModel):
+    total: int
+    price: PriceRange
+    category_id: list[FacetCount]
+    brand_id: list[FacetCount]
+    color_id: list[FacetCount]
+    size_id: list[FacetCount]
+    in_stock: list[StockFacetCount]
+
+
+BrandResponse.update_forward_refs(ProductResponse=ProductResponse)
+CategoryResponse.update_forward_refs(ProductResponse=ProductResponse)
@@ -31,3 +31,17 @@ class RatingDTO(BaseModel):
             "comment": "This product exceeded my expectations. Highly recommend it!",
             "stars": 5,
         }
+
+
+class RatingSummaryDTO(BaseModel):
+    rating_count: int
+    average: Optional[float]
+    histogram: dict[int, int]
+
+    class Config:
+        orm_mode = True
+
+
+class RatingPage(BaseModel):
+    items: list[RatingDTO]
+    next_cursor: Optional[str]
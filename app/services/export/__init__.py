@@ -0,0 +1,3 @@
+from .encoders import ENCODERS, ExportFormat, encode_csv, encode_ndjson, export_response
+
+__all__ = ("ENCODERS", "ExportFormat", "encode_csv", "encode_ndjson", "export_response")
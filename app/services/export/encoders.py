@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterable, AsyncIterator, Mapping, Sequence
+
+from fastapi.responses import StreamingResponse
+
+
+# rows arrive in batches, one per server-side cursor fetch
+Partitions = AsyncIterable[Sequence[Mapping[str, Any]]]
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+MEDIA_TYPES = {ExportFormat.csv: "text/csv; charset=utf-8", ExportFormat.ndjson: "application/x-ndjson"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        # kept as a string so prices survive the round trip without float rounding
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def encode_ndjson(partitions: Partitions, columns: Sequence[str]) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield "".join(json.dumps({column: row[column] for column in columns}, default=_json_default,
+                                 separators=(",", ":")) + "\n" for row in rows).encode()
+
+
+async def encode_csv(partitions: Partitions, columns: Sequence[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def flush() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    # the header goes out before the query has returned anything
+    writer.writerow(columns)
+    yield flush()
+    async for rows in partitions:
+        writer.writerows([row[column] for column in columns] for row in rows)
+        yield flush()
+
+
+ENCODERS = {ExportFormat.csv: encode_csv, ExportFormat.ndjson: encode_ndjson}
+
+
+def export_response(partitions: Partitions, columns: Sequence[str], format: ExportFormat,
+                    filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        ENCODERS[format](partitions, columns),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format.value}"'},
+    )
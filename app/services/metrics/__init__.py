@@ -0,0 +1,6 @@
+from .instruments import InstrumentedQueuePool, instrument_engine, password_hasher_collector, pool_collector
+from .middleware import MetricsMiddleware
+from .registry import Counter, Gauge, Histogram, Metric, Registry, registry
+
+__all__ = ("InstrumentedQueuePool", "instrument_engine", "password_hasher_collector", "pool_collector",
+           "MetricsMiddleware", "Counter", "Gauge", "Histogram", "Metric", "Registry", "registry")
@@ -0,0 +1,108 @@
+import time
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.services.database.query_logging import fingerprint, normalize_statement
+from .registry import Counter, Gauge, Metric, registry
+
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"))
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served")
+http_request_queries = registry.histogram(
+    "http_request_db_queries", "Database queries issued per HTTP request", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100))
+
+db_queries = registry.counter(
+    "db_queries_total", "Database statements by fingerprint", ("fingerprint",))
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Database statement latency by fingerprint", ("fingerprint",))
+db_statements = registry.gauge(
+    "db_statement_info", "Normalized text of each statement fingerprint", ("fingerprint", "statement"))
+db_pool_wait = registry.histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection")
+db_pool_timeouts = registry.counter(
+    "db_pool_timeouts_total", "Connection checkouts that gave up waiting for the pool")
+
+MAX_STATEMENT_LABEL_LENGTH = 200
+_described: set[str] = set()
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    # SQLAlchemy has no event for "started waiting for a connection", so checkout is timed here
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_pool_timeouts.inc()
+            raise
+        finally:
+            db_pool_wait.observe(time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started: Optional[float] = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    key = fingerprint(statement)
+    if key not in _described:
+        _described.add(key)
+        db_statements.set(1, key, normalize_statement(statement)[:MAX_STATEMENT_LABEL_LENGTH])
+    db_queries.inc(key)
+    db_query_duration.observe(time.perf_counter() - started, key)
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def pool_collector(db: Any) -> Iterable[Metric]:
+    engine = db.engine
+    if engine is None:
+        return []
+    pool = engine.sync_engine.pool
+    metrics = []
+    for name, help, read in (
+            ("db_pool_size", "Configured number of persistent connections", "size"),
+            ("db_pool_checked_out", "Connections currently in use", "checkedout"),
+            ("db_pool_checked_in", "Idle connections in the pool", "checkedin"),
+            ("db_pool_overflow", "Connections open beyond the pool size", "overflow")):
+        if not hasattr(pool, read):
+            continue
+        gauge = Gauge(name, help)
+        # QueuePool reports overflow as open connections minus pool size, negative until it is full
+        gauge.set(max(0, getattr(pool, read)()))
+        metrics.append(gauge)
+    return metrics
+
+
+def password_hasher_collector(hasher: Any) -> Iterable[Metric]:
+    snapshot = hasher.metrics.snapshot()
+    metrics: list[Metric] = []
+    for name, help, key in (
+            ("password_hash_completed_total", "Password hashes and verifications completed", "completed"),
+            ("password_hash_rejected_total", "Password hashing requests rejected as busy", "rejected"),
+            ("password_hash_queue_wait_seconds_total", "Time spent queued for a hashing worker", "queue_wait_seconds_total"),
+            ("password_hash_seconds_total", "Time spent hashing", "hash_seconds_total")):
+        counter = Counter(name, help)
+        counter.inc(amount=snapshot[key])
+        metrics.append(counter)
+    for name, help, key in (
+            ("password_hash_in_flight", "Hashing requests queued or running", "in_flight"),
+            ("password_hash_queue_wait_seconds_max", "Longest wait for a hashing worker", "queue_wait_seconds_max"),
+            ("password_hash_seconds_max", "Longest single hash", "hash_seconds_max")):
+        gauge = Gauge(name, help)
+        gauge.set(snapshot[key])
+        metrics.append(gauge)
+    return metrics
@@ -0,0 +1,46 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.database.query_tracking import current_queries
+
+from .instruments import http_request_duration, http_request_queries, http_requests, http_requests_in_flight
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            await send(message)
+            # recorded only once the start went through: an outer middleware can still refuse
+            # it (an exceeded query budget in raise mode), and the client then gets a 500
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            # the router stores the matched route in the scope; labelling by its template
+            # instead of the raw path keeps one series per endpoint
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method, template, str(status_code))
+            http_request_duration.observe(duration, method, template)
+            # counted by QueryTrackingMiddleware, which wraps this one
+            queries = current_queries.get()
+            if queries is not None:
+                http_request_queries.observe(queries.count, method, template)
@@ -0,0 +1,3 @@
+from .importer import ImportFormat, ImportReport, PARSERS, ProductImporter, parse_csv, parse_ndjson
+
+__all__ = ("ImportFormat", "ImportReport", "PARSERS", "ProductImporter", "parse_csv", "parse_ndjson")
@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import dataclasses
+import json
+import sys
+from typing import AsyncIterator, BinaryIO
+
+from app.config.settings import settings
+from app.services.database import db
+from . import PARSERS, ImportFormat, ProductImporter
+
+
+async def read_chunks(stream: BinaryIO, size: int = 1 << 16) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await asyncio.to_thread(stream.read, size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def main(args: argparse.Namespace) -> int:
+    import_format = ImportFormat(args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv"))
+
+    db.initialize(settings)
+    try:
+        stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+        with stream:
+            importer = ProductImporter(db.session_factory(), chunk_size=args.chunk_size)
+            report = await importer.run(PARSERS[import_format](read_chunks(stream)))
+    finally:
+        await db.dispose()
+
+    print(json.dumps(dataclasses.asdict(report), indent=2))
+    return 1 if report.error_count else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.services.product_import",
+                                     description="Bulk import products from CSV or NDJSON")
+    parser.add_argument("path", help="file to import, or - for stdin")
+    parser.add_argument("--format", choices=[item.value for item in ImportFormat])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    sys.exit(asyncio.run(main(parser.parse_args())))
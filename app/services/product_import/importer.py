@@ -0,0 +1,278 @@
+import codecs
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from enum import Enum
+from typing import Any, AsyncIterable, AsyncIterator, Optional, Type
+
+from asyncpg.exceptions import DataError
+from pydantic import ValidationError
+from sqlalchemy import or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.cache import response_cache
+from app.services.database.models import Base, Brand, Category, Color, Size
+from app.services.database.repositories.product import ProductRepository
+from app.services.database.schemas.product import ProductCreate
+
+
+STAGING_TABLE = "product_import_staging"
+STAGING_COLUMNS = ("line_number", "name", "base_price", "sale_price", "description", "in_stock",
+                   "category_id", "brand_id", "color_id", "size_id", "quantity")
+PRODUCT_COLUMNS = STAGING_COLUMNS[1:]
+
+# rows may reference lookups by id ("category_id") or by name ("category")
+REFERENCES: dict[str, Type[Base]] = {"category": Category, "brand": Brand, "color": Color, "size": Size}
+
+MAX_REPORTED_ERRORS = 1000
+
+# the staging and products columns: numeric(8) keeps whole units below 10**8, integer is int4
+PRICE_LIMIT = Decimal(10 ** 8)
+INT4_MIN, INT4_MAX = -2 ** 31, 2 ** 31 - 1
+INTEGER_COLUMNS = ("category_id", "brand_id", "color_id", "size_id", "quantity")
+
+
+@dataclass
+class ImportReport:
+    received: int = 0
+    valid: int = 0
+    inserted: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+    def add_error(self, row: int, error: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": error})
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def parse_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[dict[str, Any]]:
+    header: Optional[list[str]] = None
+    record = ""
+    async for line in _lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        # an odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2:
+            continue
+        if record.strip():
+            values = next(csv.reader([record]))
+            if header is None:
+                header = [name.strip() for name in values]
+            else:
+                yield {name: value for name, value in zip(header, values) if value != ""}
+        record = ""
+
+
+async def parse_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[dict[str, Any]]:
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as error:
+            item = {"__error__": f"Invalid JSON: {error}"}
+        if not isinstance(item, dict):
+            item = {"__error__": "Each line must be a JSON object"}
+        yield item
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+PARSERS = {ImportFormat.csv: parse_csv, ImportFormat.ndjson: parse_ndjson}
+
+
+class ProductImporter:
+    def __init__(self, session: AsyncSession, chunk_size: int = 5000) -> None:
+        self.session = session
+        self.chunk_size = chunk_size
+        self._ids: dict[str, dict[str, Optional[int]]] = {name: {} for name in REFERENCES}
+        self._existing: dict[str, dict[int, bool]] = {name: {} for name in REFERENCES}
+
+    @staticmethod
+    def _given_id(data: dict[str, Any], reference: str) -> Optional[int]:
+        try:
+            given_id = int(data[f"{reference}_id"])
+        except (KeyError, TypeError, ValueError):
+            # missing, or malformed and left for ProductCreate to report
+            return None
+        # out of range ids are reported by the range check in _validate, not looked up
+        return given_id if INT4_MIN <= given_id <= INT4_MAX else None
+
+    async def _resolve_references(self, session: AsyncSession, rows: list[tuple[int, dict[str, Any]]]) -> None:
+        # one query per lookup table per chunk, covering the names and the raw ids the chunk
+        # uses, and only for those not seen in earlier chunks; a dangling id left to the
+        # merge would fail the whole import on the foreign key instead of its own row
+        for reference, model in REFERENCES.items():
+            known = self._ids[reference]
+            existing = self._existing[reference]
+            wanted = {str(data[reference]) for _, data in rows if data.get(reference) is not None} - known.keys()
+            wanted_ids = {self._given_id(data, reference) for _, data in rows
+                          if data.get(reference) is None} - existing.keys() - {None}
+            if not wanted and not wanted_ids:
+                continue
+            result = await session.execute(select(model.name, model.id).where(
+                or_(model.name.in_(wanted), model.id.in_(wanted_ids))))
+            found = dict(result.all())
+            known.update({name: found.get(name) for name in wanted})
+            found_ids = set(found.values())
+            existing.update({id: id in found_ids for id in wanted_ids})
+
+    def _validate(self, row: int, data: dict[str, Any], report: ImportReport) -> Optional[tuple]:
+        if "__error__" in data:
+            report.add_error(row, data["__error__"])
+            return None
+        if not data.get("name"):
+            # products are matched on name, so a nameless row could never be updated again
+            report.add_error(row, "name: field required")
+            return None
+        for reference in REFERENCES:
+            name = data.pop(reference, None)
+            if name is None:
+                given_id = self._given_id(data, reference)
+                if given_id is not None and not self._existing[reference].get(given_id, False):
+                    report.add_error(row, f"Unknown {reference}_id {given_id}")
+                    return None
+                continue
+            reference_id = self._ids[reference].get(str(name))
+            if reference_id is None:
+                report.add_error(row, f"Unknown {reference} {name!r}")
+                return None
+            data[f"{reference}_id"] = reference_id
+        try:
+            product = ProductCreate(**data)
+        except ValidationError as error:
+            report.add_error(row, "; ".join(
+                f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors()))
+            return None
+
+        values = product.dict()
+        values["in_stock"] = True if values["in_stock"] is None else values["in_stock"]
+        for column in INTEGER_COLUMNS:
+            if values[column] is not None and not INT4_MIN <= values[column] <= INT4_MAX:
+                report.add_error(row, f"{column}: value is out of range")
+                return None
+        for price in ("base_price", "sale_price"):
+            if values[price] is not None:
+                value = Decimal(str(values[price]))
+                # Postgres rounds to the column's scale before checking its precision
+                if not value.is_finite() or abs(value.to_integral_value(ROUND_HALF_UP)) >= PRICE_LIMIT:
+                    report.add_error(row, f"{price}: must be a finite amount below {PRICE_LIMIT}")
+                    return None
+                values[price] = value
+        return (row, *(values[column] for column in PRODUCT_COLUMNS))
+
+    async def _copy(self, session: AsyncSession, records: list[tuple]) -> None:
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(STAGING_TABLE, records=records, columns=STAGING_COLUMNS)
+
+    async def _load_chunk(self, session: AsyncSession, rows: list[tuple[int, dict[str, Any]]],
+                          report: ImportReport) -> None:
+        await self._resolve_references(session, rows)
+        records = [record for record in (self._validate(row, data, report) for row, data in rows) if record]
+        if records:
+            report.valid += await self._copy_checked(session, records, report)
+
+    async def _copy_checked(self, session: AsyncSession, records: list[tuple], report: ImportReport) -> int:
+        # a backstop for values _validate let through but the database refuses: the failing
+        # COPY is rolled back to a savepoint and the chunk halved until the bad rows are
+        # isolated and reported, instead of aborting the whole import
+        try:
+            async with session.begin_nested():
+                await self._copy(session, records)
+            return len(records)
+        except (DataError, OverflowError) as error:
+            if len(records) == 1:
+                report.add_error(records[0][0], f"Rejected by the database: {error}")
+                return 0
+        middle = len(records) // 2
+        return (await self._copy_checked(session, records[:middle], report)
+                + await self._copy_checked(session, records[middle:], report))
+
+    async def _merge(self, session: AsyncSession, report: ImportReport) -> None:
+        columns = ", ".join(PRODUCT_COLUMNS)
+        # products are matched on name, the catalogue's natural key; the last row for a name wins
+        latest = f"SELECT DISTINCT ON (name) {columns} FROM {STAGING_TABLE} ORDER BY name, line_number DESC"
+        updated = await session.execute(text(f"""
+            UPDATE products AS p
+            SET {", ".join(f"{column} = s.{column}" for column in PRODUCT_COLUMNS if column != "name")},
+                updated_at = now()
+            FROM ({latest}) AS s
+            WHERE p.name = s.name
+        """))
+        inserted = await session.execute(text(f"""
+            INSERT INTO products ({columns})
+            SELECT {columns} FROM ({latest}) AS s
+            WHERE NOT EXISTS (SELECT 1 FROM products AS p WHERE p.name = s.name)
+        """))
+        report.updated = updated.rowcount
+        report.inserted = inserted.rowcount
+
+    async def run(self, records: AsyncIterable[dict[str, Any]]) -> ImportReport:
+        report = ImportReport()
+        started = time.perf_counter()
+
+        # the whole upload is one transaction: it holds the advisory lock and a pooled
+        # connection until the last row is merged, in exchange for an import that applies
+        # entirely or not at all; very large catalogues are better split into several uploads
+        async with self.session as session:
+            # concurrent imports would race on the name match, so they are serialized
+            await session.execute(text("SELECT pg_advisory_xact_lock(hashtext('product_import'))"))
+            await session.execute(text(f"""
+                CREATE TEMP TABLE {STAGING_TABLE} (
+                    line_number integer NOT NULL,
+                    name varchar NOT NULL,
+                    base_price numeric(8),
+                    sale_price numeric(8),
+                    description text,
+                    in_stock boolean NOT NULL,
+                    category_id integer NOT NULL,
+                    brand_id integer,
+                    color_id integer,
+                    size_id integer,
+                    quantity integer NOT NULL
+                ) ON COMMIT DROP
+            """))
+
+            chunk: list[tuple[int, dict[str, Any]]] = []
+            async for data in records:
+                report.received += 1
+                chunk.append((report.received, data))
+                if len(chunk) >= self.chunk_size:
+                    await self._load_chunk(session, chunk, report)
+                    chunk = []
+            if chunk:
+                await self._load_chunk(session, chunk, report)
+
+            if report.valid:
+                await self._merge(session, report)
+            await session.commit()
+
+        if report.inserted or report.updated:
+            await response_cache.invalidate_tags(*ProductRepository.listing_cache_tags)
+
+        report.elapsed_seconds = round(time.perf_counter() - started, 3)
+        if report.elapsed_seconds:
+            report.rows_per_second = round(report.received / report.elapsed_seconds, 1)
+        return report
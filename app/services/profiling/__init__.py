@@ -0,0 +1,4 @@
+from .middleware import ProfilingMiddleware
+from .store import SORT_KEYS, ProfileInfo, ProfileStore, profile_store
+
+__all__ = ("ProfilingMiddleware", "SORT_KEYS", "ProfileInfo", "ProfileStore", "profile_store")
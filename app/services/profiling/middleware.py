@@ -0,0 +1,94 @@
+import asyncio
+import cProfile
+import logging
+import random
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.database import db
+from app.services.security.oauth2 import get_current_user
+from .store import ProfileInfo, ProfileStore, new_profile_id
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, store: ProfileStore, header: str = "X-Profile", sample_rate: float = 0.0) -> None:
+        self.app = app
+        self.store = store
+        self.header = header.lower()
+        self.sample_rate = sample_rate
+        # only one cProfile profiler can be active per thread
+        self._busy = False
+
+    async def _is_admin(self, headers: Headers) -> bool:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            async with db.session_factory() as session:
+                user = await get_current_user(token, session)
+        except HTTPException:
+            return False
+        return user.is_superuser
+
+    async def _trigger(self, scope: Scope) -> Optional[str]:
+        headers = Headers(scope=scope)
+        if self.header in headers:
+            # a request from anyone else is served as if the header was not there
+            return "header" if await self._is_admin(headers) else None
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._busy:
+            await self.app(scope, receive, send)
+            return
+
+        trigger = await self._trigger(scope)
+        if trigger is None or self._busy:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        # the profiler hooks the whole thread, so tasks of concurrent requests that run
+        # while this one awaits show up in the report as well
+        self._busy = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._busy = False
+            route = scope.get("route")
+            info = ProfileInfo(
+                id=profile_id,
+                method=scope["method"],
+                path=scope["path"],
+                route=getattr(route, "path", None),
+                status=status_code,
+                duration_ms=round((time.perf_counter() - started) * 1000, 3),
+                trigger=trigger,
+                created_at=time.time(),
+            )
+            try:
+                await asyncio.to_thread(self.store.save, info, profiler)
+            except OSError as error:
+                logger.warning("Could not store profile %s: %s", profile_id, error)
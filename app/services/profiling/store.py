@@ -0,0 +1,100 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import secrets
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.config.settings import settings
+
+
+_PROFILE_ID = re.compile(r"^\d{19}-[0-9a-f]{8}$")
+
+SORT_KEYS = ("cumulative", "tottime", "calls")
+
+
+@dataclass
+class ProfileInfo:
+    id: str
+    method: str
+    path: str
+    route: Optional[str]
+    status: int
+    duration_ms: float
+    trigger: str
+    created_at: float
+
+
+def new_profile_id() -> str:
+    # time first, so file names sort oldest to newest
+    return f"{time.time_ns():019d}-{secrets.token_hex(4)}"
+
+
+class ProfileStore:
+    # a bounded ring buffer on disk: one .prof file (pstats format, loadable by
+    # snakeviz and friends) and one .json sidecar per report, oldest evicted first
+    def __init__(self, directory: Path, max_reports: int) -> None:
+        self.directory = directory
+        self.max_reports = max_reports
+
+    def _path(self, profile_id: str, suffix: str) -> Optional[Path]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        return self.directory / f"{profile_id}{suffix}"
+
+    def save(self, info: ProfileInfo, profiler: cProfile.Profile) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # the sidecar is written last and renamed into place, so listings never see half a report
+        profiler.dump_stats(self._path(info.id, ".prof"))
+        sidecar = self._path(info.id, ".json")
+        partial = sidecar.with_suffix(".json.tmp")
+        partial.write_text(json.dumps(asdict(info)))
+        os.replace(partial, sidecar)
+        self._evict()
+
+    def _evict(self) -> None:
+        reports = sorted(self.directory.glob("*.json"))
+        for sidecar in reports[:max(0, len(reports) - self.max_reports)]:
+            sidecar.unlink(missing_ok=True)
+            sidecar.with_suffix(".prof").unlink(missing_ok=True)
+
+    def list(self) -> list[ProfileInfo]:
+        if not self.directory.is_dir():
+            return []
+        reports = []
+        for sidecar in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                reports.append(ProfileInfo(**json.loads(sidecar.read_text())))
+            except (OSError, ValueError, TypeError):
+                # evicted or rewritten by another process while listing
+                continue
+        return reports
+
+    def get(self, profile_id: str) -> Optional[ProfileInfo]:
+        sidecar = self._path(profile_id, ".json")
+        if sidecar is None or not sidecar.is_file():
+            return None
+        return ProfileInfo(**json.loads(sidecar.read_text()))
+
+    def stats_path(self, profile_id: str) -> Optional[Path]:
+        path = self._path(profile_id, ".prof")
+        if path is None or not path.is_file():
+            return None
+        return path
+
+    def render(self, profile_id: str, sort: str = "cumulative", limit: int = 50) -> Optional[str]:
+        path = self.stats_path(profile_id)
+        if path is None:
+            return None
+        output = io.StringIO()
+        stats = pstats.Stats(str(path), stream=output)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+profile_store = ProfileStore(Path(settings.PROFILING_DIR), settings.PROFILING_MAX_REPORTS)
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -8,18 +8,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config.settings import settings
 from app.services.database.schemas.security.token import TokenPayload
-from app.services.database import DatabaseManager
+from app.services.database import get_db_session
 from app.services.database.models.user import User
+from app.services.security.principal_cache import principal_cache
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl="api/v1/login")
+optional_oauth2 = OAuth2PasswordBearer(tokenUrl="api/v1/login", auto_error=False)
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-db = DatabaseManager()
-db.initialize(settings)
-
 
 async def create_access_token(token_payload: dict[str: Any]) -> str:
     to_encode = token_payload.copy()
@@ -36,7 +35,7 @@ async def verify_access_token(token: str, credential_exception: HTTPException):
         user_id = payload.get("user_id")
         sub = payload.get("sub")
 
-        if id is None:
+        if user_id is None:
             raise credential_exception
 
         token_data = TokenPayload(user_id=user_id, sub=sub)
@@ -47,14 +46,30 @@ async def verify_access_token(token: str, credential_exception: HTTPException):
     return token_data
 
 
-async def get_current_user(token: str = Depends(reusable_oauth2), session: AsyncSession = Depends(db.get_db_session)):
+async def get_current_user(token: str = Depends(reusable_oauth2), session: AsyncSession = Depends(get_db_session)):
     credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                                           detail="Could not validate credentials",
                                           headers={"WWW-Authenticate": "Bearer"})
 
     token_verified = await verify_access_token(token, credentials_exception)
 
+    user = await principal_cache.get(token_verified.user_id)
+    if user is not None:
+        return user
+
     async with session:
-        user = await session.scalar(select(User).filter(User.email == token_verified.sub))
+        user = await session.scalar(select(User).filter(User.id == token_verified.user_id))
+
+    if not user:
+        raise credentials_exception
+
+    await principal_cache.set(user)
 
     return user
+
+
+async def get_optional_user(token: Optional[str] = Depends(optional_oauth2),
+                            session: AsyncSession = Depends(get_db_session)) -> Optional[User]:
+    if token is None:
+        return None
+    return await get_current_user(token, session)
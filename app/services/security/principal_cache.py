@@ -0,0 +1,41 @@
+from typing import Optional
+
+from app.config.settings import settings
+from app.services.cache import CacheBackend, create_cache
+from app.services.database.models.user import User
+
+
+# hashed_password is deliberately left out so it never ends up in a shared cache
+PRINCIPAL_FIELDS = ("id", "username", "full_name", "email", "is_active", "is_superuser",
+                    "address", "city", "country", "telephone")
+
+
+class PrincipalCache:
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"principal:{user_id}"
+
+    async def get(self, user_id: int) -> Optional[User]:
+        data = await self.backend.get(self._key(user_id))
+        if data is None:
+            return None
+        return User(**data)
+
+    async def set(self, user: User) -> None:
+        data = {field: getattr(user, field) for field in PRINCIPAL_FIELDS}
+        await self.backend.set(self._key(user.id), data)
+
+    async def invalidate(self, *user_ids: int) -> None:
+        await self.backend.delete(*(self._key(user_id) for user_id in user_ids if user_id is not None))
+
+
+principal_cache = PrincipalCache(create_cache(
+    settings.USER_CACHE_BACKEND,
+    ttl=settings.USER_CACHE_TTL,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    redis_url=settings.REDIS_URL,
+    prefix="user",
+))
@@ -0,0 +1,32 @@
+from app.config.settings import settings
+from app.services.database import db
+from .queue import JobQueue, MemoryJobQueue, PostgresJobQueue, QueuedJob, create_job_queue
+from .registry import JobRegistry, UnknownJob, registry
+from .tasks import listing_warming_enabled
+from .worker import Worker
+
+
+job_queue = create_job_queue(
+    settings.JOB_QUEUE_BACKEND,
+    db,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    lock_timeout=settings.JOB_LOCK_TIMEOUT,
+)
+
+
+def create_worker(queue: JobQueue = job_queue) -> Worker:
+    # session_factory is looked up per job, since db is only initialized at startup
+    return Worker(
+        queue,
+        registry,
+        session_factory=lambda: db.session_factory(),
+        concurrency=settings.WORKER_CONCURRENCY,
+        poll_interval=settings.WORKER_POLL_INTERVAL,
+        backoff=settings.JOB_RETRY_BACKOFF,
+        backoff_max=settings.JOB_RETRY_BACKOFF_MAX,
+    )
+
+
+__all__ = ("JobQueue", "MemoryJobQueue", "PostgresJobQueue", "QueuedJob", "create_job_queue",
+           "JobRegistry", "UnknownJob", "registry", "Worker", "job_queue", "create_worker",
+           "listing_warming_enabled")
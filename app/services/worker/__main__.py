@@ -0,0 +1,38 @@
+import asyncio
+import logging
+import signal
+import sys
+
+from app.config.settings import settings
+from app.services.database import db
+from . import create_worker, job_queue
+
+
+logger = logging.getLogger("app.services.worker")
+
+
+async def main() -> int:
+    if settings.JOB_QUEUE_BACKEND == "memory":
+        logger.error("JOB_QUEUE_BACKEND=memory runs jobs inside the API process; "
+                     "set it to postgres to run a standalone worker")
+        return 1
+
+    db.initialize(settings)
+    worker = create_worker(job_queue)
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+
+    logger.info("Worker started with concurrency %s", worker.concurrency)
+    try:
+        await worker.run()
+    finally:
+        await db.dispose()
+    logger.info("Worker stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    sys.exit(asyncio.run(main()))
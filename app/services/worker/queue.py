@@ -0,0 +1,186 @@
+import heapq
+import itertools
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Optional
+
+from sqlalchemy import delete, event, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.database import DatabaseManager
+from app.services.database.models import Job
+
+
+@dataclass
+class QueuedJob:
+    id: int
+    name: str
+    payload: dict[str, Any]
+    attempts: int
+    max_attempts: int
+    dedupe_key: Optional[str] = None
+
+
+class JobQueue(ABC):
+    def __init__(self, max_attempts: int = 5) -> None:
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    async def enqueue(self, name: str, payload: Optional[dict[str, Any]] = None, delay: float = 0,
+                      dedupe_key: Optional[str] = None, max_attempts: Optional[int] = None,
+                      session: Optional[AsyncSession] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def fetch(self, limit: int) -> list[QueuedJob]:
+        ...
+
+    @abstractmethod
+    async def complete(self, job: QueuedJob) -> None:
+        ...
+
+    @abstractmethod
+    async def fail(self, job: QueuedJob, error: str, retry_in: Optional[float]) -> None:
+        ...
+
+
+@dataclass(order=True)
+class _MemoryEntry:
+    run_at: float
+    sequence: int
+    job: QueuedJob = field(compare=False)
+
+
+class MemoryJobQueue(JobQueue):
+    def __init__(self, max_attempts: int = 5) -> None:
+        super().__init__(max_attempts)
+        self._heap: list[_MemoryEntry] = []
+        self._queued_keys: set[str] = set()
+        self._ids = itertools.count(1)
+        self.failed: list[tuple[QueuedJob, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def enqueue(self, name: str, payload: Optional[dict[str, Any]] = None, delay: float = 0,
+                      dedupe_key: Optional[str] = None, max_attempts: Optional[int] = None,
+                      session: Optional[AsyncSession] = None) -> None:
+        def push() -> None:
+            if dedupe_key is not None:
+                if dedupe_key in self._queued_keys:
+                    return
+                self._queued_keys.add(dedupe_key)
+            job = QueuedJob(id=next(self._ids), name=name, payload=dict(payload or {}), attempts=0,
+                            max_attempts=max_attempts or self.max_attempts, dedupe_key=dedupe_key)
+            heapq.heappush(self._heap, _MemoryEntry(time.monotonic() + delay, job.id, job))
+
+        if session is None:
+            push()
+            return
+
+        # the heap cannot join a database transaction, so the job is pushed once the
+        # caller's transaction commits; a rollback or close ends it without the push
+        settled = False
+
+        def committed(_: Any) -> None:
+            nonlocal settled
+            if not settled:
+                settled = True
+                push()
+
+        def ended(_: Any, transaction: Any) -> None:
+            nonlocal settled
+            if transaction.parent is None:
+                settled = True
+
+        event.listen(session.sync_session, "after_commit", committed)
+        event.listen(session.sync_session, "after_transaction_end", ended)
+
+    async def fetch(self, limit: int) -> list[QueuedJob]:
+        jobs = []
+        now = time.monotonic()
+        while self._heap and len(jobs) < limit and self._heap[0].run_at <= now:
+            job = heapq.heappop(self._heap).job
+            self._queued_keys.discard(job.dedupe_key)
+            job.attempts += 1
+            jobs.append(job)
+        return jobs
+
+    async def complete(self, job: QueuedJob) -> None:
+        pass
+
+    async def fail(self, job: QueuedJob, error: str, retry_in: Optional[float]) -> None:
+        if retry_in is None:
+            self.failed.append((job, error))
+            return
+        heapq.heappush(self._heap, _MemoryEntry(time.monotonic() + retry_in, next(self._ids), job))
+
+
+class PostgresJobQueue(JobQueue):
+    def __init__(self, db: DatabaseManager, max_attempts: int = 5, lock_timeout: int = 300) -> None:
+        super().__init__(max_attempts)
+        self.db = db
+        self.lock_timeout = lock_timeout
+
+    async def enqueue(self, name: str, payload: Optional[dict[str, Any]] = None, delay: float = 0,
+                      dedupe_key: Optional[str] = None, max_attempts: Optional[int] = None,
+                      session: Optional[AsyncSession] = None) -> None:
+        stmt = pg_insert(Job).values(
+            name=name,
+            payload=payload or {},
+            max_attempts=max_attempts or self.max_attempts,
+            run_at=func.now() + timedelta(seconds=delay),
+            dedupe_key=dedupe_key,
+        ).on_conflict_do_nothing(index_elements=[Job.dedupe_key], index_where=text("status = 'queued'"))
+
+        if session is not None:
+            # joins the caller's transaction, so the job only exists if that work commits
+            await session.execute(stmt)
+            return
+        async with self.db.session_factory() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    async def fetch(self, limit: int) -> list[QueuedJob]:
+        # jobs whose worker died mid-run become claimable again once their lock times out
+        claimable = select(Job.id).where(or_(
+            (Job.status == "queued") & (Job.run_at <= func.now()),
+            (Job.status == "running") & (Job.locked_at < func.now() - timedelta(seconds=self.lock_timeout)),
+        )).order_by(Job.run_at, Job.id).limit(limit).with_for_update(skip_locked=True)
+
+        stmt = update(Job).where(Job.id.in_(claimable.scalar_subquery())).values(
+            status="running", locked_at=func.now(), attempts=Job.attempts + 1
+        ).returning(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts, Job.dedupe_key)
+
+        async with self.db.session_factory() as session:
+            rows = (await session.execute(stmt)).all()
+            await session.commit()
+        return [QueuedJob(id=row.id, name=row.name, payload=row.payload, attempts=row.attempts,
+                          max_attempts=row.max_attempts, dedupe_key=row.dedupe_key) for row in rows]
+
+    async def complete(self, job: QueuedJob) -> None:
+        async with self.db.session_factory() as session:
+            await session.execute(delete(Job).where(Job.id == job.id))
+            await session.commit()
+
+    async def fail(self, job: QueuedJob, error: str, retry_in: Optional[float]) -> None:
+        # a newer job may already hold the dedupe key, and a retry must not collide with it
+        values: dict[str, Any] = {"last_error": error, "locked_at": None, "dedupe_key": None}
+        if retry_in is None:
+            values.update(status="failed")
+        else:
+            values.update(status="queued", run_at=func.now() + timedelta(seconds=retry_in))
+        async with self.db.session_factory() as session:
+            await session.execute(update(Job).where(Job.id == job.id).values(**values))
+            await session.commit()
+
+
+def create_job_queue(backend: str, db: DatabaseManager, max_attempts: int = 5, lock_timeout: int = 300) -> JobQueue:
+    if backend == "memory":
+        return MemoryJobQueue(max_attempts=max_attempts)
+    if backend == "postgres":
+        return PostgresJobQueue(db, max_attempts=max_attempts, lock_timeout=lock_timeout)
+    raise ValueError(f"Unknown job queue backend: {backend}")
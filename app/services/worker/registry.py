@@ -0,0 +1,35 @@
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+JobHandler = Callable[..., Awaitable[None]]
+
+
+class UnknownJob(LookupError):
+    pass
+
+
+class JobRegistry:
+    def __init__(self) -> None:
+        self._handlers: dict[str, JobHandler] = {}
+
+    def task(self, name: str) -> Callable[[JobHandler], JobHandler]:
+        def decorator(handler: JobHandler) -> JobHandler:
+            if name in self._handlers:
+                raise ValueError(f"Job {name!r} is already registered")
+            self._handlers[name] = handler
+            return handler
+        return decorator
+
+    def get(self, name: str) -> JobHandler:
+        try:
+            return self._handlers[name]
+        except KeyError:
+            raise UnknownJob(f"No handler registered for job {name!r}")
+
+    async def run(self, name: str, session: AsyncSession, payload: dict) -> None:
+        await self.get(name)(session, **payload)
+
+
+registry = JobRegistry()
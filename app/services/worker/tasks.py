@@ -0,0 +1,76 @@
+import logging
+from typing import Optional, Sequence
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.services.database.models import Order
+from app.services.database.repositories.order.order_repository import ORDER_STATUS_PENDING
+from app.services.database.repositories.product import RatingRepository
+from .registry import registry
+
+
+logger = logging.getLogger(__name__)
+
+ORDER_STATUS_CONFIRMED = "Confirmed"
+
+# the anonymous first pages every storefront visit starts from
+WARM_PATHS = ("/api/v1/products/", "/api/v1/categories/", "/api/v1/brands/")
+
+
+@registry.task("ratings.refresh_summary")
+async def refresh_rating_summary(session: AsyncSession, product_id: int) -> None:
+    await RatingRepository(session).refresh_rating_summary(product_id)
+
+
+@registry.task("orders.post_process")
+async def post_process_order(session: AsyncSession, order_id: int) -> None:
+    async with session:
+        order = await session.scalar(update(Order).where(
+            Order.id == order_id, Order.status == ORDER_STATUS_PENDING
+        ).values(status=ORDER_STATUS_CONFIRMED).returning(Order))
+        await session.commit()
+    if order is not None:
+        logger.info("Order %s confirmed for user %s, total %.2f", order.id, order.user_id, order.total_price)
+
+
+async def _asgi_get(app, path: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+    }
+    status = 500
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def listing_warming_enabled() -> bool:
+    # the job renders into the response cache of the process that runs it; an in-memory
+    # cache filled by a standalone worker is one no API process ever reads
+    return settings.RESPONSE_CACHE_ENABLED and (
+        settings.RESPONSE_CACHE_BACKEND != "memory" or settings.JOB_QUEUE_BACKEND == "memory")
+
+
+@registry.task("cache.warm_listings")
+async def warm_listings(session: AsyncSession, paths: Optional[Sequence[str]] = None) -> None:
+    if not listing_warming_enabled():
+        logger.info("Skipping listing warm-up: the response cache is not shared with the API processes")
+        return
+    # rendered through the app itself so the response cache middleware stores each page
+    from app.main import app
+
+    for path in paths or WARM_PATHS:
+        status = await _asgi_get(app, path)
+        if status != 200:
+            logger.warning("Warming %s returned %s", path, status)
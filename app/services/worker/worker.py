@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import random
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .queue import JobQueue, QueuedJob
+from .registry import JobRegistry, UnknownJob
+
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    def __init__(self, queue: JobQueue, registry: JobRegistry, session_factory: Callable[[], AsyncSession],
+                 concurrency: int = 4, poll_interval: float = 1.0, backoff: float = 2.0,
+                 backoff_max: float = 300.0) -> None:
+        self.queue = queue
+        self.registry = registry
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._running: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def retry_delay(self, attempts: int) -> float:
+        # exponential backoff with full jitter so failing jobs do not retry in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (attempts - 1)))
+
+    async def execute(self, job: QueuedJob) -> None:
+        try:
+            async with self.session_factory() as session:
+                await self.registry.run(job.name, session, job.payload)
+
+        except UnknownJob as error:
+            logger.error("Dropping job %s: %s", job.id, error)
+            await self.queue.fail(job, str(error), retry_in=None)
+
+        except Exception as error:
+            retry_in = self.retry_delay(job.attempts) if job.attempts < job.max_attempts else None
+            logger.exception("Job %s (%s) failed on attempt %s/%s", job.id, job.name, job.attempts, job.max_attempts)
+            await self.queue.fail(job, repr(error), retry_in=retry_in)
+
+        else:
+            await self.queue.complete(job)
+
+    async def _wait(self, timeout: float) -> None:
+        waiters = [asyncio.ensure_future(self._stopping.wait()), *self._running]
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiters[0].cancel()
+
+    async def run(self) -> None:
+        self._stopping.clear()
+        while not self._stopping.is_set():
+            free = self.concurrency - len(self._running)
+            jobs = []
+            if free > 0:
+                try:
+                    jobs = await self.queue.fetch(free)
+                except Exception:
+                    logger.exception("Could not fetch jobs")
+            for job in jobs:
+                task = asyncio.create_task(self.execute(job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+            if not jobs or len(self._running) >= self.concurrency:
+                await self._wait(self.poll_interval)
+
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def shutdown(self) -> None:
+        self.stop()
+        if self._task is not None:
+            await self._task
+            self._task = None
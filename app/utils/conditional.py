@@ -0,0 +1,69 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+def _strip_weak(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [_strip_weak(value) for value in if_none_match.split(",")]
+    return "*" in candidates or _strip_weak(etag) in candidates
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: datetime
+    # a list page can change membership without any of its rows getting newer, so
+    # only its ETag, which covers the row ids, is trusted there
+    time_based: bool = True
+
+    @classmethod
+    def build(cls, key: str, last_modified: Optional[datetime], *parts: Any,
+              time_based: bool = True) -> Optional["Validators"]:
+        if last_modified is None:
+            return None
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        raw = "|".join((key, last_modified.isoformat(), *map(str, parts)))
+        return cls(etag=f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"', last_modified=last_modified,
+                   time_based=time_based)
+
+    @property
+    def http_last_modified(self) -> str:
+        return format_datetime(self.last_modified.astimezone(timezone.utc), usegmt=True)
+
+    def is_fresh(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, self.etag)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or not self.time_based:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return self.last_modified.replace(microsecond=0) <= since
+
+    def apply(self, response: Response) -> None:
+        response.headers["ETag"] = self.etag
+        if self.time_based:
+            response.headers["Last-Modified"] = self.http_last_modified
+
+    def not_modified(self) -> Response:
+        response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+        self.apply(response)
+        return response
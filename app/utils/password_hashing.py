@@ -1,4 +1,92 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+
 from passlib.context import CryptContext
 
+from app.config.settings import settings
+
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+@dataclass
+class HashingMetrics:
+    completed: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    queue_wait_seconds_total: float = 0.0
+    queue_wait_seconds_max: float = 0.0
+    hash_seconds_total: float = 0.0
+    hash_seconds_max: float = 0.0
+
+    def observe(self, queue_wait: float, hash_time: float) -> None:
+        self.completed += 1
+        self.queue_wait_seconds_total += queue_wait
+        self.queue_wait_seconds_max = max(self.queue_wait_seconds_max, queue_wait)
+        self.hash_seconds_total += hash_time
+        self.hash_seconds_max = max(self.hash_seconds_max, hash_time)
+
+    def snapshot(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class AsyncPasswordHasher:
+    def __init__(self, context: CryptContext, max_workers: int = 4, max_queue_size: int = 64) -> None:
+        self.context = context
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.metrics = HashingMetrics()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.metrics.in_flight >= self.max_workers + self.max_queue_size:
+            self.metrics.rejected += 1
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        submitted_at = time.perf_counter()
+        timings: dict[str, float] = {}
+
+        def task() -> Any:
+            started_at = time.perf_counter()
+            timings["queue_wait"] = started_at - submitted_at
+            try:
+                return func(*args)
+            finally:
+                timings["hash_time"] = time.perf_counter() - started_at
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hasher")
+
+        self.metrics.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, task)
+        finally:
+            self.metrics.in_flight -= 1
+            if "hash_time" in timings:
+                self.metrics.observe(timings["queue_wait"], timings["hash_time"])
+
+    async def hash(self, secret: str) -> str:
+        return await self._run(self.context.hash, secret)
+
+    async def verify(self, secret: str, hashed: str) -> bool:
+        return await self._run(self.context.verify, secret, hashed)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = AsyncPasswordHasher(
+    pwd_context,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
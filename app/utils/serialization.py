@@ -0,0 +1,103 @@
+import weakref
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Mapping, Optional, Type
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, create_model
+from pydantic.fields import (SHAPE_FROZENSET, SHAPE_LIST, SHAPE_SEQUENCE, SHAPE_SET, SHAPE_SINGLETON,
+                             SHAPE_TUPLE_ELLIPSIS, ModelField)
+
+
+Serializer = Callable[[Any], dict[str, Any]]
+Converter = Callable[[Any], Any]
+
+SEQUENCE_SHAPES = {SHAPE_LIST, SHAPE_SET, SHAPE_FROZENSET, SHAPE_SEQUENCE, SHAPE_TUPLE_ELLIPSIS}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# weak, so trimmed models evicted from trimmed_model's cache take their serializer with them
+_serializers: "weakref.WeakKeyDictionary[Type[BaseModel], Serializer]" = weakref.WeakKeyDictionary()
+
+
+def _converter(field: ModelField) -> Optional[Converter]:
+    item_type = field.type_
+    if isinstance(item_type, type) and issubclass(item_type, BaseModel):
+        convert: Optional[Converter] = compile_serializer(item_type)
+    elif item_type is float:
+        # Numeric columns come back as Decimal, which the DTOs declare as float
+        convert = float
+    else:
+        # everything else is already a type orjson writes the way jsonable_encoder would
+        convert = None
+
+    if field.shape == SHAPE_SINGLETON:
+        return convert
+    if field.shape in SEQUENCE_SHAPES:
+        if convert is None:
+            return list
+        return lambda values: [None if value is None else convert(value) for value in values]
+    return None
+
+
+def compile_serializer(model: Type[BaseModel]) -> Serializer:
+    # builds a row-to-dict function from the model's fields once, so trusted database
+    # rows are rendered without running pydantic validation on every response
+    serializer = _serializers.get(model)
+    if serializer is not None:
+        return serializer
+
+    fields: list[tuple[str, str, Optional[Converter]]] = []
+
+    def serialize(obj: Any) -> dict[str, Any]:
+        read = obj.get if isinstance(obj, Mapping) else lambda name: getattr(obj, name, None)
+        data = {}
+        for alias, name, convert in fields:
+            value = read(name)
+            data[alias] = value if value is None or convert is None else convert(value)
+        return data
+
+    # registered before its fields are compiled, so self-referencing models resolve
+    _serializers[model] = serialize
+    fields.extend((field.alias, field.name, _converter(field)) for field in model.__fields__.values())
+    return serialize
+
+
+def serialize_many(model: Type[BaseModel], items: Any) -> list[dict[str, Any]]:
+    serialize = compile_serializer(model)
+    return [serialize(item) for item in items]
+
+
+@lru_cache(maxsize=256)
+def trimmed_model(model: Type[BaseModel], names: frozenset[str]) -> Type[BaseModel]:
+    # a copy of model restricted to the given fields, for sparse fieldset responses
+    fields = {
+        name: (Optional[field.outer_type_] if field.allow_none else field.outer_type_,
+               ... if field.required else field.default)
+        for name, field in model.__fields__.items() if name in names
+    }
+    return create_model(f"{model.__name__}Fields", __config__=model.__config__, **fields)
+
+
+def fast_response(model: Type[BaseModel], content: Any, status_code: int = 200,
+                  headers: Optional[Mapping[str, str]] = None) -> FastJSONResponse:
+    # returning a Response skips FastAPI's response_model validation, so only use this
+    # for content built from database rows whose shape already matches the model
+    return FastJSONResponse(compile_serializer(model)(content), status_code=status_code, headers=headers)
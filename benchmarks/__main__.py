@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from app.config.settings import settings
+from app.services.database import db
+from . import dataset
+from .dataset import Scale
+from .driver import LoadProfile, compare, run_load
+from .scenarios import DEFAULT_MIX
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# settings that change what a run measures, recorded with every result
+RECORDED_SETTINGS = ("RESPONSE_CACHE_ENABLED", "RESPONSE_CACHE_BACKEND", "REFERENCE_CACHE_ENABLED",
+                     "SQLALCHEMY_POOL_SIZE", "SQLALCHEMY_MAX_OVERFLOW", "PASSWORD_HASH_WORKERS",
+                     "CART_BACKEND", "JOB_QUEUE_BACKEND", "QUERY_LOG_MODE")
+
+
+def parse_scale(args: argparse.Namespace) -> Scale:
+    scale = Scale.preset(args.scale)
+    overrides = {name: getattr(args, name) for name in scale.dict() if getattr(args, name, None) is not None}
+    return Scale(**{**scale.dict(), **overrides})
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+async def seed(args: argparse.Namespace) -> int:
+    scale = parse_scale(args)
+    db.initialize(settings)
+    try:
+        async with db.session_factory() as session:
+            if args.reset:
+                await dataset.reset(session)
+            elif not await dataset.is_empty(session):
+                print("The database already has data; pass --reset to truncate the benchmark tables first",
+                      file=sys.stderr)
+                return 1
+            counts = await dataset.load(session, scale, seed=args.seed)
+            await session.commit()
+    finally:
+        await db.dispose()
+    print(json.dumps({"seed": args.seed, "scale": scale.dict(), "rows": counts}, indent=2))
+    return 0
+
+
+async def run(args: argparse.Namespace) -> int:
+    from app.main import app
+
+    profile = LoadProfile(concurrency=args.concurrency, duration=args.duration, warmup=args.warmup,
+                          seed=args.seed, mix=parse_mix(args.mix) if args.mix else DEFAULT_MIX)
+    results = await run_load(app, parse_scale(args), profile,
+                             {name: getattr(settings, name) for name in RECORDED_SETTINGS})
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(json.dumps({"overall": results["overall"], "output": str(output)}, indent=2))
+    return 1 if results["overall"]["errors"] else 0
+
+
+def show_comparison(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text())
+    candidate = json.loads(Path(args.candidate).read_text())
+    print(f"{'section':<12} {'metric':<20} {'baseline':>12} {'candidate':>12} {'change':>8}")
+    for row in compare(baseline, candidate):
+        change = "n/a" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+        print(f"{row['section']:<12} {row['metric']:<20} {row['baseline']:>12} {row['candidate']:>12} {change:>8}")
+    return 0
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--scale", choices=("small", "medium", "large"), default="medium")
+    parser.add_argument("--seed", type=int, default=42)
+    for name in Scale().dict():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Seeded load and latency benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="load the deterministic dataset")
+    add_scale_arguments(seed_parser)
+    seed_parser.add_argument("--reset", action="store_true", help="truncate the benchmark tables first")
+
+    run_parser = commands.add_parser("run", help="drive the API in-process and record latencies")
+    add_scale_arguments(run_parser)
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=30.0)
+    run_parser.add_argument("--warmup", type=float, default=5.0)
+    run_parser.add_argument("--mix", help="scenario weights, e.g. browse=60,detail=30,checkout=10")
+    run_parser.add_argument("--output", help="result file, defaults to benchmarks/results/<timestamp>.json")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        sys.exit(show_comparison(args))
+    sys.exit(asyncio.run(seed(args) if args.command == "seed" else run(args)))
@@ -0,0 +1,92 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+from urllib.parse import urlencode
+
+from starlette.types import ASGIApp, Message
+
+
+@dataclass
+class ASGIResponse:
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class ASGIClient:
+    # calls the application directly, so measurements include routing, middleware,
+    # dependencies and the database but no sockets or HTTP parsing
+    def __init__(self, app: ASGIApp, prefix: str = "/api/v1") -> None:
+        self.app = app
+        self.prefix = prefix
+
+    async def request(self, method: str, path: str, params: Optional[Mapping[str, Any]] = None,
+                      json_body: Any = None, form: Optional[Mapping[str, str]] = None,
+                      headers: Optional[Mapping[str, str]] = None) -> ASGIResponse:
+        body = b""
+        raw_headers = [(b"host", b"benchmark")]
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            raw_headers.append((b"content-type", b"application/json"))
+        elif form is not None:
+            body = urlencode(form).encode()
+            raw_headers.append((b"content-type", b"application/x-www-form-urlencoded"))
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+        raw_headers.extend((name.lower().encode(), value.encode()) for name, value in (headers or {}).items())
+
+        full_path = f"{self.prefix}{path}"
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": full_path,
+            "raw_path": full_path.encode(),
+            "root_path": "",
+            "query_string": urlencode(params or {}, doseq=True).encode(),
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("benchmark", 80),
+        }
+
+        request_sent = False
+        finished = asyncio.Event()
+        status_code = 500
+        response_headers: dict[str, str] = {}
+        chunks: list[bytes] = []
+
+        async def receive() -> Message:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # streaming responses listen for a disconnect; it only comes once they are done
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers.update((name.decode(), value.decode()) for name, value in message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    finished.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            finished.set()
+        return ASGIResponse(status_code, response_headers, b"".join(chunks))
+
+    async def get(self, path: str, **kwargs: Any) -> ASGIResponse:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs: Any) -> ASGIResponse:
+        return await self.request("POST", path, **kwargs)
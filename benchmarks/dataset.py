@@ -0,0 +1,205 @@
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator, Type
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.database.models import (Base, Brand, Category, Color, Order, OrderItem, Product, Rating,
+                                          RatingSummary, Size, User)
+from app.utils.password_hashing import password_hasher
+
+
+PASSWORD = "benchmark-password"
+EPOCH = datetime(2023, 1, 1, tzinfo=timezone.utc)
+CHUNK_SIZE = 5000
+
+COLORS = ("black", "white", "red", "blue", "green", "yellow", "grey", "brown", "pink", "purple")
+SIZES = ("XS", "S", "M", "L", "XL", "XXL")
+ADJECTIVES = ("classic", "slim", "vintage", "waterproof", "organic", "wireless", "compact", "premium",
+              "lightweight", "leather", "cotton", "portable", "ergonomic", "heated", "foldable")
+NOUNS = ("jacket", "sneakers", "backpack", "headphones", "watch", "lamp", "chair", "mug", "wallet",
+         "blender", "keyboard", "scarf", "kettle", "tent", "bottle", "speaker", "notebook", "hoodie")
+
+# every table the generator writes, children last so TRUNCATE ... CASCADE order does not matter
+TABLES: tuple[Type[Base], ...] = (User, Category, Brand, Color, Size, Product, Rating, RatingSummary, Order, OrderItem)
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int = 1000
+    categories: int = 20
+    brands: int = 50
+    products: int = 10000
+    ratings_per_product: int = 5
+    orders: int = 2000
+    items_per_order: int = 3
+
+    @classmethod
+    def preset(cls, name: str) -> "Scale":
+        factor = {"small": 0.1, "medium": 1, "large": 10}[name]
+        return cls(users=int(cls.users * factor), categories=cls.categories, brands=cls.brands,
+                   products=int(cls.products * factor), ratings_per_product=cls.ratings_per_product,
+                   orders=int(cls.orders * factor), items_per_order=cls.items_per_order)
+
+    def dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def category_name(index: int) -> str:
+    return f"Category {index}"
+
+
+def product_name(rng: random.Random, id: int) -> str:
+    return f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS)} {id}"
+
+
+class DatasetGenerator:
+    # every row derives from one seeded Random in a fixed order, so the same seed
+    # and scale always produce byte-identical tables
+    def __init__(self, scale: Scale, seed: int = 42) -> None:
+        self.scale = scale
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.prices: dict[int, float] = {}
+
+    def _timestamp(self, days: int = 365) -> datetime:
+        return EPOCH + timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def users(self, hashed_password: str) -> Iterator[dict[str, Any]]:
+        for id in range(1, self.scale.users + 1):
+            yield {"id": id, "username": f"user{id}", "full_name": f"Benchmark User {id}",
+                   "email": f"user{id}@bench.example", "hashed_password": hashed_password,
+                   "is_active": True, "is_superuser": id == 1, "address": f"{id} Main Street",
+                   "city": "Springfield", "country": "US", "telephone": f"+1555{id:07d}",
+                   "created_at": self._timestamp()}
+
+    def categories(self) -> Iterator[dict[str, Any]]:
+        for id in range(1, self.scale.categories + 1):
+            yield {"id": id, "name": category_name(id), "created_at": EPOCH}
+
+    def brands(self) -> Iterator[dict[str, Any]]:
+        for id in range(1, self.scale.brands + 1):
+            yield {"id": id, "name": f"Brand {id}", "description": f"Benchmark brand number {id}", "created_at": EPOCH}
+
+    def colors(self) -> Iterator[dict[str, Any]]:
+        for id, name in enumerate(COLORS, start=1):
+            yield {"id": id, "name": name, "created_at": EPOCH}
+
+    def sizes(self) -> Iterator[dict[str, Any]]:
+        for id, name in enumerate(SIZES, start=1):
+            yield {"id": id, "name": name, "created_at": EPOCH}
+
+    def products(self) -> Iterator[dict[str, Any]]:
+        rng = self.rng
+        for id in range(1, self.scale.products + 1):
+            base_price = rng.randrange(5, 2000)
+            self.prices[id] = base_price
+            yield {"id": id, "name": product_name(rng, id), "base_price": base_price,
+                   "sale_price": int(base_price * 0.8) if rng.random() < 0.2 else None,
+                   "description": f"A {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} for everyday use.",
+                   "in_stock": rng.random() < 0.95,
+                   "category_id": rng.randint(1, self.scale.categories),
+                   "brand_id": rng.randint(1, self.scale.brands) if rng.random() < 0.9 else None,
+                   "color_id": rng.randint(1, len(COLORS)) if rng.random() < 0.8 else None,
+                   "size_id": rng.randint(1, len(SIZES)) if rng.random() < 0.6 else None,
+                   # deep stock so checkout traffic never runs the catalogue dry
+                   "quantity": rng.randrange(1000, 100000),
+                   "created_at": self._timestamp()}
+
+    def ratings(self) -> Iterator[dict[str, Any]]:
+        rng = self.rng
+        id = 0
+        per_product = min(self.scale.ratings_per_product, self.scale.users)
+        for product_id in range(1, self.scale.products + 1):
+            for user_id in rng.sample(range(1, self.scale.users + 1), rng.randint(0, per_product)):
+                id += 1
+                yield {"id": id, "user_id": user_id, "product_id": product_id, "stars": rng.randint(1, 5),
+                       "comment": "Benchmark review", "created_at": self._timestamp()}
+
+    def orders(self) -> Iterator[tuple[dict[str, Any], list[dict[str, Any]]]]:
+        rng = self.rng
+        item_id = 0
+        for id in range(1, self.scale.orders + 1):
+            items = []
+            for product_id in rng.sample(range(1, self.scale.products + 1),
+                                         min(rng.randint(1, self.scale.items_per_order), self.scale.products)):
+                item_id += 1
+                items.append({"id": item_id, "name": f"Product {product_id}", "order_id": id,
+                              "product_id": product_id, "price": float(self.prices[product_id]),
+                              "quantity": rng.randint(1, 3), "created_at": EPOCH})
+            user_id = rng.randint(1, self.scale.users)
+            order = {"id": id, "user_id": user_id, "status": "Confirmed",
+                     "total_price": sum(item["price"] * item["quantity"] for item in items),
+                     "address": f"{user_id} Main Street", "city": "Springfield", "country": "US",
+                     "telephone": f"+1555{user_id:07d}", "created_at": self._timestamp()}
+            yield order, items
+
+
+async def _insert(session: AsyncSession, model: Type[Base], rows: Iterator[dict[str, Any]]) -> int:
+    count = 0
+    chunk: list[dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            await session.execute(insert(model), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        await session.execute(insert(model), chunk)
+        count += len(chunk)
+    return count
+
+
+async def is_empty(session: AsyncSession) -> bool:
+    for model in (User, Product, Order):
+        if await session.scalar(select(func.count()).select_from(model)):
+            return False
+    return True
+
+
+async def reset(session: AsyncSession) -> None:
+    tables = ", ".join(model.__tablename__ for model in TABLES)
+    await session.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+
+async def load(session: AsyncSession, scale: Scale, seed: int = 42) -> dict[str, int]:
+    generator = DatasetGenerator(scale, seed)
+    # every user shares one password, so it is hashed once instead of once per row
+    hashed_password = await password_hasher.hash(PASSWORD)
+
+    counts = {
+        "users": await _insert(session, User, generator.users(hashed_password)),
+        "categories": await _insert(session, Category, generator.categories()),
+        "brands": await _insert(session, Brand, generator.brands()),
+        "colors": await _insert(session, Color, generator.colors()),
+        "sizes": await _insert(session, Size, generator.sizes()),
+        "products": await _insert(session, Product, generator.products()),
+        "ratings": await _insert(session, Rating, generator.ratings()),
+    }
+
+    orders = list(generator.orders())
+    counts["orders"] = await _insert(session, Order, (order for order, _ in orders))
+    counts["order_items"] = await _insert(session, OrderItem, (item for _, items in orders for item in items))
+
+    # summaries are maintained incrementally by the API, so bulk loaded ratings need one full rebuild
+    await session.execute(text(f"""
+        INSERT INTO {RatingSummary.__tablename__}
+            (product_id, rating_count, stars_total, stars_1, stars_2, stars_3, stars_4, stars_5)
+        SELECT product_id, count(*), sum(stars),
+               count(*) FILTER (WHERE stars = 1), count(*) FILTER (WHERE stars = 2),
+               count(*) FILTER (WHERE stars = 3), count(*) FILTER (WHERE stars = 4),
+               count(*) FILTER (WHERE stars = 5)
+        FROM {Rating.__tablename__}
+        GROUP BY product_id
+    """))
+
+    # ids were written explicitly, so the sequences have to be moved past them
+    for model in TABLES:
+        if model is RatingSummary:
+            continue
+        table = model.__tablename__
+        await session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(max(id), 0) + 1, false) FROM {table}"))
+    return counts
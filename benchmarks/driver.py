@@ -0,0 +1,191 @@
+import asyncio
+import contextvars
+import math
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Mapping, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp
+
+from app.services.database import db
+from .client import ASGIClient
+from .dataset import Scale
+from .scenarios import SCENARIOS, VirtualUser
+
+
+_queries: contextvars.ContextVar[Optional[list[int]]] = contextvars.ContextVar("benchmark_queries", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class QueryCounter:
+    # the counter lives in a context variable, so queries issued by concurrent
+    # virtual users are attributed to the scenario that caused them
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", _count_query)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        event.remove(self.engine, "before_cursor_execute", _count_query)
+
+
+@dataclass
+class Sample:
+    scenario: str
+    latency_ms: float
+    requests: int
+    queries: int
+    statuses: list[int]
+    error: Optional[str] = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or any(status >= 500 for status in self.statuses)
+
+
+@dataclass
+class LoadProfile:
+    concurrency: int = 16
+    duration: float = 30.0
+    warmup: float = 5.0
+    seed: int = 42
+    mix: Mapping[str, int] = field(default_factory=dict)
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    # nearest-rank, so every reported value is a latency that was actually observed
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def summarize(samples: Sequence[Sample], elapsed: float) -> dict[str, Any]:
+    latencies = sorted(sample.latency_ms for sample in samples)
+    requests = sum(sample.requests for sample in samples)
+    statuses = Counter(status for sample in samples for status in sample.statuses)
+    return {
+        "count": len(samples),
+        "requests": requests,
+        "errors": sum(sample.failed for sample in samples),
+        "throughput_per_s": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "requests_per_s": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "queries_per_request": round(sum(sample.queries for sample in samples) / requests, 2) if requests else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+async def _run_scenario(user: VirtualUser, name: str) -> Sample:
+    counter = [0]
+    token = _queries.set(counter)
+    user.responses = []
+    error = None
+    started = time.perf_counter()
+    try:
+        await SCENARIOS[name](user)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    finally:
+        latency_ms = (time.perf_counter() - started) * 1000
+        _queries.reset(token)
+    return Sample(name, latency_ms, len(user.responses), counter[0],
+                  [response.status_code for response in user.responses], error)
+
+
+async def _drive(user: VirtualUser, mix: Mapping[str, int], deadline: float, samples: Optional[list[Sample]]) -> None:
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        sample = await _run_scenario(user, user.rng.choices(names, weights)[0])
+        if samples is not None:
+            samples.append(sample)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_load(app: ASGIApp, scale: Scale, profile: LoadProfile,
+                   settings_snapshot: Mapping[str, Any]) -> dict[str, Any]:
+    unknown = set(profile.mix) - SCENARIOS.keys()
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    started_at = datetime.now(timezone.utc)
+    async with app.router.lifespan_context(app):
+        client = ASGIClient(app)
+        # each virtual user has its own seeded Random, so a run replays the same request sequence
+        users = [VirtualUser(client, random.Random(profile.seed * 1000 + index), scale,
+                             user_id=index % scale.users + 1) for index in range(profile.concurrency)]
+        await asyncio.gather(*(user.login() for user in users))
+
+        samples: list[Sample] = []
+        with QueryCounter(db.engine.sync_engine):
+            if profile.warmup:
+                deadline = time.perf_counter() + profile.warmup
+                await asyncio.gather(*(_drive(user, profile.mix, deadline, None) for user in users))
+            started = time.perf_counter()
+            deadline = started + profile.duration
+            await asyncio.gather(*(_drive(user, profile.mix, deadline, samples) for user in users))
+            elapsed = time.perf_counter() - started
+
+    errors = Counter(sample.error for sample in samples if sample.error)
+    return {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "seed": profile.seed,
+            "scale": scale.dict(),
+            "concurrency": profile.concurrency,
+            "duration_s": profile.duration,
+            "warmup_s": profile.warmup,
+            "elapsed_s": round(elapsed, 3),
+            "mix": dict(profile.mix),
+            "settings": dict(settings_snapshot),
+        },
+        "overall": summarize(samples, elapsed),
+        "scenarios": {name: summarize([sample for sample in samples if sample.scenario == name], elapsed)
+                      for name in profile.mix},
+        "errors": dict(errors.most_common(20)),
+    }
+
+
+def compare(baseline: Mapping[str, Any], candidate: Mapping[str, Any]) -> list[dict[str, Any]]:
+    rows = []
+    sections = {"overall": (baseline["overall"], candidate["overall"])}
+    sections.update((name, (baseline["scenarios"][name], candidate["scenarios"][name]))
+                    for name in baseline["scenarios"] if name in candidate["scenarios"])
+    for name, (before, after) in sections.items():
+        for metric, path in (("p50_ms", ("latency_ms", "p50")), ("p95_ms", ("latency_ms", "p95")),
+                             ("p99_ms", ("latency_ms", "p99")), ("throughput_per_s", ("throughput_per_s",)),
+                             ("queries_per_request", ("queries_per_request",))):
+            old, new = before, after
+            for key in path:
+                old, new = old[key], new[key]
+            change = round((new - old) / old * 100, 1) if old else None
+            rows.append({"section": name, "metric": metric, "baseline": old, "candidate": new, "change_pct": change})
+    return rows
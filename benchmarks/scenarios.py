@@ -0,0 +1,95 @@
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from .client import ASGIClient, ASGIResponse
+from .dataset import ADJECTIVES, NOUNS, PASSWORD, Scale, category_name
+
+
+@dataclass
+class VirtualUser:
+    client: ASGIClient
+    rng: random.Random
+    scale: Scale
+    user_id: int
+    token: Optional[str] = None
+    responses: list[ASGIResponse] = field(default_factory=list)
+
+    @property
+    def auth(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    async def call(self, method: str, path: str, **kwargs) -> ASGIResponse:
+        response = await self.client.request(method, path, **kwargs)
+        self.responses.append(response)
+        return response
+
+    async def login(self) -> ASGIResponse:
+        response = await self.call("POST", "/login", form={"username": f"user{self.user_id}@bench.example",
+                                                           "password": PASSWORD})
+        if response.status_code == 200:
+            self.token = response.json()["access_token"]
+        return response
+
+
+Scenario = Callable[[VirtualUser], Awaitable[None]]
+
+
+async def browse(user: VirtualUser) -> None:
+    rng = user.rng
+    kind = rng.random()
+    if kind < 0.5:
+        params = {"limit": 20, "sort": rng.choice(("id", "name", "base_price", "created_at")),
+                  "desc": rng.choice(("true", "false"))}
+        if rng.random() < 0.5:
+            params["category_id"] = rng.randint(1, user.scale.categories)
+        if rng.random() < 0.3:
+            params["in_stock"] = "true"
+        first = await user.call("GET", "/products/", params=params)
+        # a third of the visitors look at the second page
+        if first.status_code == 200 and rng.random() < 0.33 and first.json().get("next_cursor"):
+            await user.call("GET", "/products/", params={**params, "cursor": first.json()["next_cursor"]})
+    elif kind < 0.8:
+        words = [rng.choice(NOUNS)] if rng.random() < 0.7 else [rng.choice(ADJECTIVES), rng.choice(NOUNS)]
+        await user.call("GET", "/products/search", params={"q": " ".join(words), "limit": 20})
+    else:
+        name = category_name(rng.randint(1, user.scale.categories)).lower().replace(" ", "-")
+        await user.call("GET", f"/categories/{name}", params={"limit": 20})
+
+
+async def detail(user: VirtualUser) -> None:
+    product_id = user.rng.randint(1, user.scale.products)
+    await user.call("GET", f"/products/{product_id}")
+    await user.call("GET", f"/products/{product_id}/ratings", params={"limit": 10})
+
+
+async def login(user: VirtualUser) -> None:
+    await user.login()
+
+
+async def rate(user: VirtualUser) -> None:
+    rng = user.rng
+    await user.call("POST", "/products/ratings/create", headers=user.auth, json_body={
+        "product_id": rng.randint(1, user.scale.products),
+        "stars": rng.randint(1, 5),
+        "comment": "Rated during a benchmark run",
+    })
+
+
+async def checkout(user: VirtualUser) -> None:
+    rng = user.rng
+    for product_id in rng.sample(range(1, user.scale.products + 1), rng.randint(1, 3)):
+        await user.call("POST", "/cart/add", headers=user.auth,
+                        json_body={"product_id": product_id, "quantity": rng.randint(1, 2)})
+    await user.call("POST", "/orders/checkout", headers=user.auth, json_body={})
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "browse": browse,
+    "detail": detail,
+    "login": login,
+    "rate": rate,
+    "checkout": checkout,
+}
+
+DEFAULT_MIX = {"browse": 55, "detail": 30, "login": 5, "rate": 5, "checkout": 5}
@@ -0,0 +1,78 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.services.database.models import Brand, Category, Color, Product, RatingSummary, Size
+from app.services.database.schemas.product import ProductPage
+from app.utils.serialization import fast_response
+
+
+def build_page(items: int) -> dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    category = Category(id=1, name="Phones", created_at=now)
+    brand = Brand(id=1, name="Apple", description="Technology and electronics company.", created_at=now)
+    color = Color(id=1, name="black", created_at=now)
+    size = Size(id=1, name="M", created_at=now)
+    products = []
+    for id in range(1, items + 1):
+        product = Product(
+            id=id, name=f"Product {id}", base_price=Decimal(1000 + id), sale_price=Decimal(900 + id),
+            description="A text description " * 4, in_stock=True, quantity=id,
+            category_id=1, brand_id=1, color_id=1, size_id=1, created_at=now, updated_at=now)
+        product.category, product.brand, product.color, product.size = category, brand, color, size
+        product.rating_summary = RatingSummary(product_id=id, rating_count=5, stars_total=21.0, stars_1=0,
+                                               stars_2=0, stars_3=1, stars_4=2, stars_5=2, updated_at=now)
+        products.append(product)
+    return {"items": products, "next_cursor": "eyJpZCI6IDEwMH0"}
+
+
+def validated_path(content: dict[str, Any]) -> bytes:
+    # what FastAPI does for a response_model: validate, jsonable_encoder, json.dumps
+    return JSONResponse(jsonable_encoder(ProductPage.validate(content))).body
+
+
+def fast_path(content: dict[str, Any]) -> bytes:
+    return fast_response(ProductPage, content).body
+
+
+def measure(render: Callable[[dict[str, Any]], bytes], content: dict[str, Any], repeat: int) -> list[float]:
+    render(content)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render(content)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main(args: argparse.Namespace) -> int:
+    content = build_page(args.items)
+    if json.loads(validated_path(content)) != json.loads(fast_path(content)):
+        print("fast path output differs from the validated path", file=sys.stderr)
+        return 1
+
+    results = {}
+    for name, render in (("validated", validated_path), ("fast", fast_path)):
+        timings = measure(render, content, args.repeat)
+        results[name] = {"mean_ms": round(statistics.mean(timings), 3),
+                         "p50_ms": round(statistics.median(timings), 3),
+                         "p95_ms": round(statistics.quantiles(timings, n=20)[-1], 3)}
+    results["speedup"] = round(results["validated"]["mean_ms"] / results["fast"]["mean_ms"], 1)
+    print(json.dumps({"items": args.items, "repeat": args.repeat, **results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization",
+                                     description="Compare response_model validation with the precompiled serializers")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    sys.exit(main(parser.parse_args()))
@@ -1,3 +1,4 @@
+import logging
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -6,6 +7,7 @@ from sqlalchemy import pool
 from alembic import context
 
 from app.services.database.models import *
+from app.services.database.index_advisor import advise
 from app.config.settings import settings
 
 # this is the Alembic Config object, which provides
@@ -26,6 +28,10 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# surface unindexed foreign keys and redundant indexes whenever migrations run
+for finding in advise(target_metadata):
+    logging.getLogger("alembic.index_advisor").warning("%s", finding)
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
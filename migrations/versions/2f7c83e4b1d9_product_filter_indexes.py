@@ -0,0 +1,37 @@
+"""product filter indexes
+
+Revision ID: 2f7c83e4b1d9
+Revises: 9d41f6a2c8e7
+Create Date: 2026-10-18 11:48:05.317742
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f7c83e4b1d9'
+down_revision = '9d41f6a2c8e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_category_id_base_price', 'products',
+                    ['category_id', 'base_price', 'id'], unique=False)
+    op.create_index('ix_products_category_id_base_price_in_stock', 'products',
+                    ['category_id', 'base_price', 'id'], unique=False, postgresql_where=sa.text('in_stock'))
+    op.create_index('ix_products_brand_id_base_price', 'products',
+                    ['brand_id', 'base_price', 'id'], unique=False)
+    op.create_index('ix_products_base_price_in_stock', 'products',
+                    ['base_price', 'id'], unique=False, postgresql_where=sa.text('in_stock'))
+    op.create_index('ix_products_sale_price', 'products',
+                    ['sale_price'], unique=False, postgresql_where=sa.text('sale_price IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_sale_price', table_name='products')
+    op.drop_index('ix_products_base_price_in_stock', table_name='products')
+    op.drop_index('ix_products_brand_id_base_price', table_name='products')
+    op.drop_index('ix_products_category_id_base_price_in_stock', table_name='products')
+    op.drop_index('ix_products_category_id_base_price', table_name='products')
@@ -0,0 +1,50 @@
+"""rating summaries
+
+Revision ID: 5b2e9c1d7a43
+Revises: cdb70fdcedae
+Create Date: 2026-10-18 10:12:41.204318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e9c1d7a43'
+down_revision = 'cdb70fdcedae'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('product_rating_summaries',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('stars_total', sa.Float(), server_default='0', nullable=False),
+    sa.Column('stars_1', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('stars_2', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('stars_3', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('stars_4', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('stars_5', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+    op.execute("""
+        INSERT INTO product_rating_summaries
+            (product_id, rating_count, stars_total, stars_1, stars_2, stars_3, stars_4, stars_5)
+        SELECT product_id,
+               count(*),
+               sum(stars),
+               count(*) FILTER (WHERE least(5, greatest(1, floor(stars + 0.5))) = 1),
+               count(*) FILTER (WHERE least(5, greatest(1, floor(stars + 0.5))) = 2),
+               count(*) FILTER (WHERE least(5, greatest(1, floor(stars + 0.5))) = 3),
+               count(*) FILTER (WHERE least(5, greatest(1, floor(stars + 0.5))) = 4),
+               count(*) FILTER (WHERE least(5, greatest(1, floor(stars + 0.5))) = 5)
+        FROM ratings
+        GROUP BY product_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('product_rating_summaries')
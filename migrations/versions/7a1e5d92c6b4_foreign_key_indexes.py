@@ -0,0 +1,70 @@
+"""foreign key indexes
+
+Revision ID: 7a1e5d92c6b4
+Revises: 2f7c83e4b1d9
+Create Date: 2026-10-18 12:21:39.804516
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a1e5d92c6b4'
+down_revision = '2f7c83e4b1d9'
+branch_labels = None
+depends_on = None
+
+
+FOREIGN_KEY_INDEXES = (
+    ('ix_products_color_id', 'products', ('color_id',)),
+    ('ix_products_size_id', 'products', ('size_id',)),
+    ('ix_ratings_product_id_id', 'ratings', ('product_id', 'id')),
+    ('ix_ratings_user_id', 'ratings', ('user_id',)),
+    ('ix_orders_user_id', 'orders', ('user_id',)),
+    ('ix_order_items_order_id', 'order_items', ('order_id',)),
+    ('ix_order_items_product_id', 'order_items', ('product_id',)),
+    ('ix_order_items_color_id', 'order_items', ('color_id',)),
+    ('ix_order_items_size_id', 'order_items', ('size_id',)),
+)
+
+# duplicates of the primary key indexes created by the first migration
+PRIMARY_KEY_DUPLICATES = (
+    ('ix_brands_id', 'brands'),
+    ('ix_categories_id', 'categories'),
+    ('ix_colors_id', 'colors'),
+    ('ix_sizes_id', 'sizes'),
+    ('ix_users_id', 'users'),
+    ('ix_orders_id', 'orders'),
+    ('ix_products_id', 'products'),
+    ('ix_order_items_id', 'order_items'),
+    ('ix_ratings_id', 'ratings'),
+)
+
+
+def _create_index_concurrently(name: str, table: str, columns: tuple[str, ...]) -> None:
+    # an interrupted concurrent build leaves an invalid index behind that IF NOT EXISTS would keep
+    if not op.get_context().as_sql:
+        invalid = op.get_bind().execute(sa.text(
+            "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"), {"name": name}).first()
+        if invalid:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({", ".join(columns)})')
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in FOREIGN_KEY_INDEXES:
+            _create_index_concurrently(name, table, columns)
+        for name, _ in PRIMARY_KEY_DUPLICATES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in PRIMARY_KEY_DUPLICATES:
+            _create_index_concurrently(name, table, ('id',))
+        for name, _, _ in reversed(FOREIGN_KEY_INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')